@@ -0,0 +1,333 @@
+"""
+Asyncio scrapping engine.
+
+Scrape the websites defined in `sites.py` on a single event loop, using `aiohttp`.
+The pages of all the websites are requested concurrently, limited by:
+    - ASYNC_MAX_IN_FLIGHT: maximum number of requests in flight (all hosts).
+    - ASYNC_MAX_PER_HOST: maximum number of requests in flight per host.
+    - the adaptive per-host rate limiter (see `fetchers.AdaptiveRateLimiter`).
+    - the fetch window: a website is fetched at most `2 * ASYNC_MAX_PER_HOST` pages
+        ahead of its parsing (the pages bodies held in memory).
+The retries, the page size tuning and the pages discovery are the steps of the
+threads engine (see `scrappers.py`), run with awaited I/O.
+"""
+
+import asyncio
+from collections import namedtuple
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List
+
+import aiohttp
+
+from constants import ASYNC_MAX_IN_FLIGHT, ASYNC_MAX_PER_HOST, HTTP_TIMEOUT
+from http_client import ACCEPT_ENCODING
+from scrappers import (
+    GET,
+    SLEEP,
+    Scrapper,
+    ScrapedPage,
+    SitePages,
+    Steps,
+    in_sites_order,
+)
+
+# minimal response, with the same attributes the scrappers use from `requests.Response`
+Page = namedtuple("Page", ["url", "status_code", "headers", "content"])
+
+
+class AsyncScrapper(Scrapper):
+    def __init__(
+        self,
+        max_in_flight: int = ASYNC_MAX_IN_FLIGHT,
+        max_per_host: int = ASYNC_MAX_PER_HOST,
+    ) -> None:
+        super().__init__()
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+        self._http_stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+        }
+
+    def scrape_websites(self, site_names: List[str], max_workers: int = None) -> List:
+        """
+        Scrape the websites on one event loop and merge their items.
+
+        Args:
+            site_names (list): names of the websites to scrape (keys of `sites.SITES`).
+            max_workers (int): Maximum number of websites to scrape at the same time (default all).
+        Return:
+            items (list): list of scrapped items of all websites, in the same order as a sequential run.
+        """
+        websites_items = [list() for _ in site_names]
+
+        def on_page(page):
+            websites_items[page.site_index].extend(page.items)
+            self.checkpoint_page(page)
+
+        asyncio.run(self._scrape_websites(site_names, max_workers, on_page))
+        return [item for website_items in websites_items for item in website_items]
+
+    def iter_websites(
+        self, site_names: List[str], max_workers: int = None
+    ) -> Iterator[ScrapedPage]:
+        """
+        Scrape the websites on one event loop (in a background thread) and yield
+        their pages, as soon as each page is parsed, in the order of a sequential run
+        (see `Scrapper.iter_websites`).
+        Call `checkpoint_page` once the items of a page are handled.
+
+        Args:
+            site_names (list): names of the websites to scrape (keys of `sites.SITES`).
+            max_workers (int): Maximum number of websites to scrape at the same time (default all).
+        Return:
+            pages (iterator): every scrapped page.
+        """
+        pages = queue.Queue()
+        stop = threading.Event()
+        done = object()
+        errors = list()
+
+        def on_page(page):
+            if stop.is_set():
+                raise asyncio.CancelledError()  # the consumer stopped
+            pages.put(page)
+
+        def run():
+            try:
+                asyncio.run(
+                    self._scrape_websites(
+                        site_names, max_workers, on_page, on_site_done=pages.put
+                    )
+                )
+            except BaseException as e:
+                if not stop.is_set():
+                    errors.append(e)
+            finally:
+                pages.put(done)
+
+        thread = threading.Thread(target=run, name="scrapper-loop", daemon=True)
+        thread.start()
+        try:
+            yield from in_sites_order(iter(pages.get, done))
+            if errors:
+                raise errors[0]
+        finally:
+            stop.set()
+
+    def scrape_site(self, site_name: str) -> List[Dict]:
+        """
+        Scrape a single website defined in `sites.SITES`.
+
+        Args:
+            site_name (str): name of the website, e.g. "enasco".
+        Return:
+            items (list): list of scrapped items.
+        """
+        return self.scrape_websites([site_name])
+
+    def http_stats(self) -> Dict[str, int]:
+        """
+        Return the HTTP connections reuse statistics.
+        """
+        return dict(self._http_stats)
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Count the requests and the opened/reused connections.
+        """
+
+        def counter(key):
+            async def on_event(session, context, params):
+                self._http_stats[key] += 1
+
+            return on_event
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(counter("requests"))
+        trace_config.on_connection_create_end.append(counter("new_connections"))
+        trace_config.on_connection_reuseconn.append(counter("reused_connections"))
+        return trace_config
+
+    async def _scrape_websites(
+        self,
+        site_names: List[str],
+        max_workers: int,
+        on_page: Callable[[ScrapedPage], None],
+        on_site_done: Callable[[int], None] = None,
+    ) -> None:
+        connect_timeout, read_timeout = HTTP_TIMEOUT
+        connector = aiohttp.TCPConnector(
+            limit=self.max_in_flight, limit_per_host=self.max_per_host
+        )
+        headers = dict(self.headers, **{"Accept-Encoding": ACCEPT_ENCODING})
+        sites_semaphore = asyncio.Semaphore(max_workers or len(site_names) or 1)
+
+        async def scrape_site(session, site_index, site_name):
+            async with sites_semaphore:
+                await self._scrape_site(session, site_index, site_name, on_page)
+            if on_site_done is not None:
+                on_site_done(site_index)
+
+        async with aiohttp.ClientSession(
+            headers=headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=connect_timeout, sock_read=read_timeout
+            ),
+            trace_configs=[self._trace_config()],
+        ) as session:
+            await asyncio.gather(
+                *(
+                    scrape_site(session, site_index, site_name)
+                    for site_index, site_name in enumerate(site_names)
+                )
+            )
+
+    async def _get_async(
+        self, session: aiohttp.ClientSession, url: str, conditional: bool = False
+    ) -> Page:
+        """
+        Send a GET request, within the rate limit of the host; the response adapts the rate.
+
+        Args:
+            session (aiohttp.ClientSession): the shared session.
+            url (str): url to request.
+            conditional (bool): send the validators of the cached page, if any (default False).
+        Return:
+            page (Page): the response.
+        """
+        headers = self.page_cache.conditional_headers(url) if conditional else None
+        delay = self.throttle.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        start_time = time.monotonic()
+        try:
+            async with session.get(url, headers=headers) as response:
+                content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.throttle.record(url, None, time.monotonic() - start_time)
+            raise
+        self.throttle.record(
+            url,
+            response.status,
+            time.monotonic() - start_time,
+            response.headers.get("Retry-After"),
+        )
+        return Page(url, response.status, response.headers, content)
+
+    async def _run_steps_async(self, session: aiohttp.ClientSession, steps: Steps):
+        """
+        Run scrapping steps on the event loop (see `Scrapper._run_steps`).
+
+        Args:
+            session (aiohttp.ClientSession): the shared session.
+            steps (generator): the steps, yielding (operation, argument) and receiving the results.
+        Return:
+            result: the steps result.
+        """
+        result, error = None, None
+        while True:
+            try:
+                operation, argument = (
+                    steps.send(result) if error is None else steps.throw(error)
+                )
+            except StopIteration as stop:
+                return stop.value
+
+            result, error = None, None
+            if operation == GET:
+                try:
+                    result = await self._get_async(session, *argument)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result = e
+            elif operation == SLEEP:
+                await asyncio.sleep(argument)
+            else:  # WAIT
+                try:
+                    result = await asyncio.wrap_future(argument)
+                except Exception as e:
+                    error = e
+
+    async def _scrape_site(
+        self,
+        session: aiohttp.ClientSession,
+        site_index: int,
+        site_name: str,
+        on_page: Callable[[ScrapedPage], None],
+    ) -> None:
+        """
+        Scrape a website, passing every page to `on_page`, in pages order.
+        """
+        progress = self._site_progress(site_name)
+        base_url = progress.base_url
+        pages = SitePages(base_url)
+
+        local_now = self._start_site(base_url)
+        num_of_items = 0
+        res = None
+
+        try:
+            await self._run_steps_async(
+                session, self._discover_steps(site_name, progress, pages)
+            )
+
+            # request the pages ahead of the parsing, at most `window` pages requested
+            # and not consumed yet; the connector and the throttle pace them
+            # the first page is already fetched; its items are extracted from the same response
+            page_urls = progress.page_urls
+            to_fetch = iter(pages.to_fetch(page_urls))
+            window = 2 * max(self.max_per_host, 1)
+            fetches = dict()  # page_url: fetch task, in pages order
+
+            def fetch_ahead():
+                for page_url in to_fetch:
+                    fetches[page_url] = asyncio.ensure_future(
+                        self._run_steps_async(
+                            session, self._fetch_page_steps(page_url, conditional=True)
+                        )
+                    )
+                    if len(fetches) >= window:
+                        return
+
+            fetch_ahead()
+            try:
+                # parse in the parse pool, in pages order, while the next pages are downloading
+                for page_url in page_urls:
+                    parsed_page, res = pages.take(page_url)
+                    try:
+                        if parsed_page is None:
+                            if res is None:
+                                fetch = fetches.pop(page_url)
+                                fetch_ahead()
+                                res = await fetch
+                            parsed_page = self._parse_page(site_name, page_url, res)
+                        items = await asyncio.wrap_future(parsed_page)
+                    except Exception as e:
+                        # skip the page
+                        progress.page_failed(page_url, e)
+                        continue
+
+                    progress.page_done(page_url, items)
+                    num_of_items += len(items)
+                    on_page(self._scraped_page(progress, site_index, page_url, items))
+            finally:
+                for fetch in fetches.values():
+                    fetch.cancel()
+                await asyncio.gather(*fetches.values(), return_exceptions=True)
+        except (
+            AssertionError,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            Exception,  # un-captured exception
+        ) as e:
+            progress.abort(e)
+            self._report_error(
+                base_url, e, res if res is not None else pages.first_page
+            )
+
+        self._report_finish(base_url, local_now, num_of_items)
@@ -0,0 +1,175 @@
+"""
+Benchmark the HTML parser backends on saved pages of each website.
+
+Pages are stored as <pages_dir>/<site_name>/*.html (default: data/pages); the pages of
+the JSON endpoints as *.json, timed with the website `json_items` instead of the parsers.
+
+Save some pages of every website:
+    python benchmark_parsers.py --save [--pages 3] [pages_dir]
+Compare the parse time, peak memory and extracted items per backend:
+    python benchmark_parsers.py [pages_dir]
+"""
+
+import argparse
+import os
+from pathlib import Path
+import time
+import tracemalloc
+from typing import List
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from constants import DATA_DIR
+from parsing import PARSER_BACKENDS, discover_page_urls
+from sites import SITES
+
+DEFAULT_PAGES_DIR = os.path.join(Path(__file__).parent.resolve(), DATA_DIR, "pages")
+
+
+def save_pages(pages_dir: str, pages_per_site: int = 3) -> None:
+    """
+    Download the first pages of every website.
+
+    Args:
+        pages_dir (str): directory to store the pages in.
+        pages_per_site (int): number of pages to store per website.
+    Returns:
+        None
+    """
+    from scrappers import Scrapper
+
+    scrapper = Scrapper()
+    try:
+        for site_name, site in SITES.items():
+            site_dir = os.path.join(pages_dir, site_name)
+            os.makedirs(site_dir, exist_ok=True)
+
+            extension = "json" if _is_json_endpoint(site) else "html"
+
+            first_page = scrapper.http_client.get(site["base_url"])
+            page_urls = discover_page_urls(site_name, first_page.content)
+            for page_no, page_url in enumerate(page_urls[:pages_per_site]):
+                if page_url == site["base_url"]:
+                    res = first_page
+                else:
+                    res = scrapper.http_client.get(page_url)
+                page_path = os.path.join(site_dir, f"page_{page_no}.{extension}")
+                with open(page_path, "wb") as f:
+                    f.write(res.content)
+            print(f"Saved {min(len(page_urls), pages_per_site)} pages of {site_name}.")
+    finally:
+        scrapper.close()
+
+
+def _is_json_endpoint(site: dict) -> bool:
+    """
+    Return `True` if the website pages are a JSON endpoint (no tree to parse).
+    """
+    return (
+        site.get("json_items") is not None and site["json_items"].source == "document"
+    )
+
+
+def _extract_json_pages(site: dict, pages: List[bytes]) -> int:
+    """
+    Extract the JSON pages, return the number of extracted items.
+    """
+    num_of_items = 0
+    for content in pages:
+        num_of_items += len(
+            site["json_items"].extract(content, site["domain_name"]) or []
+        )
+    return num_of_items
+
+
+def _time_pages(extract, *args) -> tuple:
+    """
+    Run an extraction, return its number of items, time (ms) and peak memory (KB).
+    """
+    start_time = time.perf_counter()
+    num_of_items = extract(*args)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    # separate run; tracing the allocations slows the parsing down
+    tracemalloc.start()
+    extract(*args)
+    peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return num_of_items, elapsed_ms, peak_kb
+
+
+def _parse_pages(site: dict, pages: List[bytes], backend: str, parse_only) -> int:
+    """
+    Parse and extract the pages, return the number of extracted items.
+    """
+    num_of_items = 0
+    for content in pages:
+        soup = BeautifulSoup(content, backend, parse_only=parse_only)
+        try:
+            num_of_items += len(site["items"].extract(soup, site["domain_name"]))
+        except Exception:
+            pass  # malformed tree; counts as 0 items
+    return num_of_items
+
+
+def benchmark(pages_dir: str) -> None:
+    """
+    Parse the saved pages with every installed backend, with and without
+    the website `parse_only` restriction (or extract the JSON pages), and print the results.
+
+    Args:
+        pages_dir (str): directory of the stored pages.
+    Returns:
+        None
+    """
+    print(
+        f"{'website':<22}{'backend':<13}{'tree':<9}{'pages':>6}{'items':>7}"
+        f"{'ms/page':>10}{'peak KB':>10}"
+    )
+    for site_name, site in SITES.items():
+        site_dir = Path(pages_dir, site_name)
+        if _is_json_endpoint(site):
+            pages = [path.read_bytes() for path in sorted(site_dir.glob("*.json"))]
+            if pages:
+                num_of_items, elapsed_ms, peak_kb = _time_pages(
+                    _extract_json_pages, site, pages
+                )
+                print(
+                    f"{site_name:<22}{'json':<13}{'-':<9}{len(pages):>6}{num_of_items:>7}"
+                    f"{elapsed_ms / len(pages):>10.1f}{peak_kb:>10.0f}"
+                )
+            continue
+
+        pages = [path.read_bytes() for path in sorted(site_dir.glob("*.html"))]
+        if not pages:
+            continue
+
+        trees = [("full", None)]
+        if site.get("parse_only"):
+            trees.append(("partial", site["parse_only"]))
+
+        for backend in PARSER_BACKENDS:
+            for tree, parse_only in trees:
+                try:
+                    num_of_items, elapsed_ms, peak_kb = _time_pages(
+                        _parse_pages, site, pages, backend, parse_only
+                    )
+                except FeatureNotFound:
+                    break  # backend not installed
+
+                print(
+                    f"{site_name:<22}{backend:<13}{tree:<9}{len(pages):>6}{num_of_items:>7}"
+                    f"{elapsed_ms / len(pages):>10.1f}{peak_kb:>10.0f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("pages_dir", nargs="?", default=DEFAULT_PAGES_DIR)
+    parser.add_argument("--save", action="store_true", help="download pages first")
+    parser.add_argument("--pages", type=int, default=3, help="pages per website")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.pages_dir, args.pages)
+    benchmark(args.pages_dir)
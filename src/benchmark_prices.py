@@ -0,0 +1,202 @@
+"""
+Benchmark the price parsing on the price texts of each website.
+
+The price texts are read from the saved pages of the websites (see `benchmark_parsers.py --save`),
+<pages_dir>/<site_name>/*.html (default: data/pages); the websites without saved pages
+use the sample texts of `SAMPLE_PRICES`.
+
+Compare the former regex parsing with `prices.parse_price`, memoized or not:
+    python benchmark_prices.py [--rounds 100] [pages_dir]
+"""
+
+import argparse
+import os
+from pathlib import Path
+import re
+import time
+from typing import Callable, List
+
+from constants import DATA_DIR
+from parsing import make_soup, site_parser
+from prices import _parse_price, parse_price
+from sites import SITES
+
+DEFAULT_PAGES_DIR = os.path.join(Path(__file__).parent.resolve(), DATA_DIR, "pages")
+
+# price texts as found on the pages of each website
+SAMPLE_PRICES = {
+    "plaidonline": ["$1.50", "$3.49", "$12.99", "$0.99"],
+    "enasco": ["$5.00", "$7.10", "$24.95", "$1,234.95"],
+    "nordstromrack": ["$10.00 – $20.00", "$4.97", "$39.97", "$1,299.97 – $1,499.97"],
+    "altomusic": ["$12.99", "$149.99", "$1,099.99", "$5.00"],
+    "muscleandstrength": ["$9.99", "$24.99", "$49.99", "$3.99"],
+    "camerareadycosmetics": ["$8.00", "$19.50", "$12.00 USD", "$4.00"],
+    "officesupply": ["$2.25", "$14.79", "$149.99", "$0.45"],
+    "gamestop": ["$59.99", "$19.99", "$4.99", "$1,199.99"],
+    "scheels": ["49.99", "129.99", "1,299.00", "9.97"],
+    "academy": ["$19.99", "$5", "$34.98", "$199.99"],
+    "4sgm": ["$1.25", "$0.89", "$12.60", "$3.00"],
+}
+
+# separators formats, and their expected prices (checked on every run)
+SAMPLE_FORMATS = {
+    "$1,234": 1234.0,
+    "$1,234.56": 1234.56,
+    "1,234.56": 1234.56,
+    "1,234,567": 1234567.0,
+    "3,25": 3.25,
+    "1.234,56 €": 1234.56,
+    "1 234,56": 1234.56,
+    "1\u00a0234,56 €": 1234.56,
+    "$10.00 – $20.00": 10.0,
+    "$12.99 100 sold": 12.99,
+}
+
+
+def legacy_extract_price(text_price: str = None, thousands_comma_separator=False):
+    """
+    The former `helpers.extract_price`, for comparison.
+    """
+    if not text_price:
+        return 0
+
+    if thousands_comma_separator:
+        text_price = text_price.replace(",", "")
+
+    pattern = r"(\d+(?:\.\d+)?)"
+    extracted_price = re.findall(pattern, text_price.replace(",", "."))
+
+    return float(extracted_price[0]) if extracted_price else float(0)
+
+
+def uncached_parse_price(text: str = None, thousands_comma_separator=False):
+    """
+    `prices.parse_price` without the memoization.
+    """
+    if not text:
+        return 0.0
+    return _parse_price.__wrapped__(str(text), thousands_comma_separator)
+
+
+PARSERS = {
+    "legacy": legacy_extract_price,
+    "uncached": uncached_parse_price,
+    "cached": parse_price,
+}
+
+
+def collect_price_texts(site_name: str, pages_dir: str) -> List[str]:
+    """
+    Read the price texts of the items of the saved pages of a website.
+
+    Args:
+        site_name (str): name of the website (key of `sites.SITES`).
+        pages_dir (str): directory of the stored pages.
+    Returns:
+        texts (list): the price texts (the first found alternative of every item).
+    """
+    site = SITES[site_name]
+    items = site["items"]
+    texts = list()
+    for path in sorted(Path(pages_dir, site_name).glob("*.html")):
+        soup = make_soup(
+            path.read_bytes(), site_parser(site_name), site.get("parse_only")
+        )
+        for container in items.find_containers(soup):
+            for alternative in items.price.alternatives:
+                try:
+                    text = alternative(container)
+                except Exception:
+                    continue  # not found; next alternative
+                if text:
+                    texts.append(str(text))
+                    break
+    return texts
+
+
+def _time_parser(
+    parse: Callable, texts: List[str], thousands_separator: bool, rounds: int
+) -> float:
+    """
+    Parse the texts `rounds` times, return the time per call (µs).
+    """
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            parse(text, thousands_separator)
+    return (time.perf_counter() - start_time) * 1e6 / (rounds * len(texts))
+
+
+def benchmark(pages_dir: str, rounds: int = 100) -> None:
+    """
+    Time every price parser on the price texts of every website and on the
+    separators formats, and print the results, the texts that the former parsing
+    read differently, and the formats that are not read as expected.
+
+    Args:
+        pages_dir (str): directory of the stored pages.
+        rounds (int): number of passes over the texts of each website.
+    Returns:
+        None
+    """
+    print(
+        f"{'website':<22}{'source':<8}{'texts':>6}"
+        + "".join(f"{f'{name} µs':>13}" for name in PARSERS)
+    )
+    differences = list()
+    for site_name, site in SITES.items():
+        texts, source = collect_price_texts(site_name, pages_dir), "pages"
+        if not texts:
+            texts, source = SAMPLE_PRICES[site_name], "samples"
+        thousands_separator = site["items"].price.thousands_separator
+
+        _parse_price.cache_clear()
+        for text in texts:  # warm the memo; the same prices repeat on every run
+            parse_price(text, thousands_separator)
+        timings = [
+            _time_parser(parse, texts, thousands_separator, rounds)
+            for parse in PARSERS.values()
+        ]
+        print(
+            f"{site_name:<22}{source:<8}{len(texts):>6}"
+            + "".join(f"{timing:>13.2f}" for timing in timings)
+        )
+
+        for text in dict.fromkeys(texts):
+            old = legacy_extract_price(text, thousands_separator)
+            new = parse_price(text, thousands_separator)
+            if old != new:
+                differences.append((site_name, text, old, new))
+
+    texts = list(SAMPLE_FORMATS)
+    timings = [_time_parser(parse, texts, False, rounds) for parse in PARSERS.values()]
+    print(
+        f"{'formats':<22}{'samples':<8}{len(texts):>6}"
+        + "".join(f"{timing:>13.2f}" for timing in timings)
+    )
+    for text, expected in SAMPLE_FORMATS.items():
+        old = legacy_extract_price(text)
+        if old != expected:
+            differences.append(("formats", text, old, parse_price(text)))
+
+    if differences:
+        print("\nParsed differently (legacy -> new):")
+        for site_name, text, old, new in differences:
+            print(f"{site_name:<22}{text!r:<30}{old:>12} -> {new}")
+
+    wrong = {
+        text: parse_price(text)
+        for text, expected in SAMPLE_FORMATS.items()
+        if parse_price(text) != expected
+    }
+    for text, price in wrong.items():
+        print(f"Wrong price: {text!r} -> {price}, expected {SAMPLE_FORMATS[text]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("pages_dir", nargs="?", default=DEFAULT_PAGES_DIR)
+    parser.add_argument("--rounds", type=int, default=100, help="passes per website")
+    args = parser.parse_args()
+
+    benchmark(args.pages_dir, args.rounds)
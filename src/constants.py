@@ -12,16 +12,88 @@ TO SETUP TELEGRAM BOT:
 DATA_DIR: The directory where the data file will be stored.
 DATA_FILE_NAME: The name of the data file.
 DATA_COLUMNS: Data columns names.
-PAGES_SLEEP_INTERVAL: The number of seconds to sleep between requests (between pages).
+STORAGE_BACKEND: Where the items are stored: "csv" (the data file, rewritten every run), "parquet" (append-only price history) or "sqlite" (embedded database, see `storage.py`).
+HISTORY_DIR_NAME: The name of the price history directory, inside `DATA_DIR` ("parquet" storage).
+HISTORY_LATEST_FILE_NAME: The name of the current items file (the latest row of every item of the price history), inside `DATA_DIR` ("parquet" storage).
+DB_FILE_NAME: The name of the items database file, inside `DATA_DIR` ("sqlite" storage).
+USE_PAGE_CACHE: Send conditional requests for the listing pages, and reuse the stored items of the not modified pages.
+PAGE_CACHE_DIR_NAME: The name of the pages cache directory, inside `DATA_DIR`.
+PAGE_MEMO_FILE_NAME: The name of the extracted items memo database, inside `DATA_DIR`; pages with the same items part are not parsed again.
+PAGE_MEMO_MAX_ENTRIES: Maximum number of pages kept in the items memo (least recently used are evicted). `0` to disable the memo.
+RATE_LIMIT_INITIAL: The initial number of requests per second to the same host; it adapts to the host responses.
+RATE_LIMIT_MIN: The minimum number of requests per second to the same host (after 429/503 responses, slow responses or errors).
+RATE_LIMIT_MAX: The maximum number of requests per second to the same host (while the responses are fast and successful).
+RATE_LIMIT_BURST: The maximum number of requests sent at once to the same host.
+PAGE_RETRIES: The number of retries of a page on connection errors and retryable status codes (429, 5xx).
+RETRY_BACKOFF: The delay in seconds before the first retry of a page; doubled on every retry (with jitter).
+SITE_ERROR_BUDGET: The maximum number of failed pages of a website (skipped and reported) before the website is aborted.
+USE_CHECKPOINTS: Checkpoint the progress of every website, so an interrupted run resumes where it stopped.
+CHECKPOINT_DIR_NAME: The name of the checkpoints directory, inside `DATA_DIR`.
+CHECKPOINT_MAX_AGE: Checkpoints older than that many seconds are not resumed (the prices would be outdated).
+PREFETCH_PAGES: The number of upcoming pages to download while the current page is being parsed.
+FAN_OUT_PAGES: The maximum number of pages of a fan-out website (`fan_out` in `sites.py`) downloaded at the same time.
+HTTP_POOL_CONNECTIONS: The number of hosts to keep a connection pool for.
+HTTP_POOL_MAXSIZE: The maximum number of kept-alive connections per host.
+HTTP_TIMEOUT: The requests timeout in seconds (connect timeout, read timeout).
 SEND_ALL_UPDATES: Send notifications for both, decreased and increased prices. `False` to send only decreased prices.
 SEND_NEW_ITEMS: Either to send notifications for newly added items or not.
+TELEGRAM_MIN_INTERVAL: The minimum number of seconds between two telegram messages to the chat.
+TELEGRAM_MESSAGES_PER_MINUTE: The maximum number of telegram messages to the chat per minute (telegram limit for groups).
+TELEGRAM_MESSAGES_PER_SECOND: The maximum number of telegram messages per second, across all the chats (telegram global limit).
+TELEGRAM_MAX_ATTEMPTS: The number of attempts to send a telegram message on network errors and flood control.
+TELEGRAM_FLUSH_TIMEOUT: The maximum number of seconds to wait for the queued telegram messages at exit.
+TELEGRAM_OUTBOX_FILE_NAME: The name of the file of the telegram messages not sent at exit, inside `DATA_DIR`; they are sent first on the next run.
+NOTIFICATIONS_MODE: How the items notifications are sent: "each" (one message per item), "batch" (packed into as few messages as possible, every scraped page) or "digest" (one digest at the end of the run).
+RUN_CONCURRENTLY: Scrape the websites concurrently, each website in its own worker. `False` to scrape them one after another.
+MAX_CONCURRENT_WEBSITES: Maximum number of websites to scrape at the same time (when `RUN_CONCURRENTLY` is `True`).
+SCRAPPING_BACKEND: The scrapping engine: "threads" (blocking requests, one worker per website) or "asyncio" (aiohttp, single event loop).
+ASYNC_MAX_IN_FLIGHT: Maximum number of requests in flight, all hosts together ("asyncio" backend).
+ASYNC_MAX_PER_HOST: Maximum number of requests in flight to the same host ("asyncio" backend).
+PARSE_WORKERS: Number of processes parsing the pages. `None` for one per CPU core, `0` to parse in the fetching thread.
+HTML_PARSER: Default HTML parser backend ("lxml", "html.parser" or "html5lib"); a website can set its own `parser` in `sites.py`.
 """
 
 TELEGRAM_BOT_API_KEY = "YOUR_TOKEN"
 CHAT_ID = 12345678
+TELEGRAM_MIN_INTERVAL = 1
+TELEGRAM_MESSAGES_PER_MINUTE = 20
+TELEGRAM_MESSAGES_PER_SECOND = 30
+TELEGRAM_MAX_ATTEMPTS = 5
+TELEGRAM_FLUSH_TIMEOUT = 120
+TELEGRAM_OUTBOX_FILE_NAME = "telegram_outbox.json"
 DATA_DIR = "data"
 DATA_FILE_NAME = "data.csv"
 DATA_COLUMNS = ["item_title", "item_price", "item_url", "added_on", "updated_on"]
-PAGES_SLEEP_INTERVAL = 0.5
+STORAGE_BACKEND = "csv"
+HISTORY_DIR_NAME = "history"
+HISTORY_LATEST_FILE_NAME = "history_latest.parquet"
+DB_FILE_NAME = "data.db"
+USE_PAGE_CACHE = True
+PAGE_CACHE_DIR_NAME = "page_cache"
+PAGE_MEMO_FILE_NAME = "page_memo.db"
+PAGE_MEMO_MAX_ENTRIES = 5000
+RATE_LIMIT_INITIAL = 2
+RATE_LIMIT_MIN = 0.2
+RATE_LIMIT_MAX = 10
+RATE_LIMIT_BURST = 2
+PAGE_RETRIES = 3
+RETRY_BACKOFF = 1
+SITE_ERROR_BUDGET = 5
+USE_CHECKPOINTS = True
+CHECKPOINT_DIR_NAME = "checkpoints"
+CHECKPOINT_MAX_AGE = 6 * 60 * 60
+PREFETCH_PAGES = 2
+FAN_OUT_PAGES = 8
+HTTP_POOL_CONNECTIONS = 16
+HTTP_POOL_MAXSIZE = 8
+HTTP_TIMEOUT = (10, 60)
 SEND_ALL_UPDATES = False
 SEND_NEW_ITEMS = True
+NOTIFICATIONS_MODE = "batch"
+RUN_CONCURRENTLY = True
+MAX_CONCURRENT_WEBSITES = 4
+SCRAPPING_BACKEND = "threads"
+ASYNC_MAX_IN_FLIGHT = 256
+ASYNC_MAX_PER_HOST = 8
+PARSE_WORKERS = None
+HTML_PARSER = "lxml"
@@ -0,0 +1,234 @@
+"""
+Crawl progress of a website: the pages to scrape, the scraped pages and the failed pages.
+
+A failed page (no response after the retries, bad status code, or parse error) is
+skipped and recorded; the website is aborted once more than `error_budget` pages failed.
+
+The progress is checkpointed to disk after every page that the consumer handled
+(its items reconciled and reported, see `SiteProgress.page_reported`), so a run that
+was interrupted resumes where it stopped: the handled pages are replayed from
+the checkpoint (without reporting them again) and only the other pages are fetched.
+"""
+
+import json
+import os
+from pathlib import Path
+import time
+from typing import Dict, List, Tuple
+
+from constants import (
+    DATA_DIR,
+    SITE_ERROR_BUDGET,
+    CHECKPOINT_DIR_NAME,
+    CHECKPOINT_MAX_AGE,
+)
+
+
+class ErrorBudgetExceeded(Exception):
+    pass
+
+
+def _reason(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+def checkpoint_dir(data_dir: str = DATA_DIR) -> str:
+    """
+    Return the checkpoints directory.
+    """
+    return os.path.join(Path(__file__).parent.resolve(), data_dir, CHECKPOINT_DIR_NAME)
+
+
+class SiteCheckpoint:
+    """
+    Append-only checkpoint of a website crawl: <checkpoint_dir>/<site_name>.jsonl
+        - first line: {"started_at": <time>, "page_urls": [<url>, ...]}
+        - then a line per scraped page: {"page_url": <url>, "items": [<item>, ...]}
+    """
+
+    def __init__(
+        self,
+        site_name: str,
+        directory: str = None,
+        max_age: float = CHECKPOINT_MAX_AGE,
+    ) -> None:
+        """
+        Args:
+            site_name (str): name of the website.
+            directory (str): checkpoints directory (default data/checkpoints).
+            max_age (float): checkpoints older than that (seconds) are not resumed.
+        """
+        self.path = os.path.join(directory or checkpoint_dir(), f"{site_name}.jsonl")
+        self.max_age = max_age
+        self._started = False
+        self._valid_size = 0
+
+    def load(self) -> Tuple[List[str], Dict[str, List[Dict]]]:
+        """
+        Read the checkpoint of an interrupted crawl.
+
+        Returns:
+            page_urls (list): pages of the website (empty if there is no recent checkpoint).
+            pages (dict): page_url: items, of the scraped pages.
+        """
+        pages = dict()
+        try:
+            with open(self.path, "rb") as f:
+                header = json.loads(f.readline())
+                if time.time() - header["started_at"] > self.max_age:
+                    return list(), pages
+                self._valid_size = f.tell()
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # interrupted while writing
+                    entry = json.loads(line)
+                    pages[entry["page_url"]] = entry["items"]
+                    self._valid_size += len(line)
+        except (OSError, ValueError, KeyError):
+            return list(), pages
+        return header["page_urls"], pages
+
+    def start(self, page_urls: List[str]) -> None:
+        """
+        Start a new checkpoint.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(
+                json.dumps({"started_at": time.time(), "page_urls": page_urls}) + "\n"
+            )
+        self._started = True
+
+    def resume(self) -> None:
+        """
+        Continue the loaded checkpoint (drop its partially written line, if any).
+        """
+        with open(self.path, "r+b") as f:
+            f.truncate(self._valid_size)
+        self._started = True
+
+    def add_page(self, page_url: str, items: List[Dict]) -> None:
+        """
+        Checkpoint a handled page.
+        The file is opened for every page: the pages are handled by the consumer,
+        possibly after the website crawl is finished.
+        """
+        if self._started:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"page_url": page_url, "items": items}) + "\n")
+
+
+def clear_checkpoints(directory: str = None) -> None:
+    """
+    Remove the checkpoints (once the items of the run are saved).
+    """
+    directory = directory or checkpoint_dir()
+    for path in Path(directory).glob("*.jsonl"):
+        path.unlink()
+
+
+class SiteProgress:
+    def __init__(
+        self,
+        site_name: str,
+        base_url: str,
+        error_budget: int = SITE_ERROR_BUDGET,
+        checkpoint: SiteCheckpoint = None,
+    ) -> None:
+        """
+        Args:
+            site_name (str): name of the website.
+            base_url (str): first page of the website.
+            error_budget (int): maximum number of failed pages before the website is aborted.
+            checkpoint (SiteCheckpoint): checkpoint of the crawl (default no checkpoint).
+        """
+        self.site_name = site_name
+        self.base_url = base_url
+        self.error_budget = error_budget
+        self.page_urls = [base_url]
+        self.done = dict()  # page_url: number of items
+        self.failed = dict()  # page_url: reason
+        self.error = None  # reason of the website abort
+        self.checkpoint = checkpoint
+        self.resumed = set()  # pages handled by the interrupted crawl
+        self._checkpointed = set()
+
+    def resume(self) -> Dict[str, List[Dict]]:
+        """
+        Resume an interrupted crawl of the website, from its checkpoint.
+
+        Returns:
+            pages (dict): page_url: items, of the pages scraped by the interrupted crawl
+                (`page_urls` is set to the pages of the interrupted crawl); empty if nothing to resume.
+        """
+        if self.checkpoint is None:
+            return dict()
+
+        page_urls, pages = self.checkpoint.load()
+        if not page_urls:
+            return dict()
+
+        self.page_urls = page_urls
+        self.checkpoint.resume()
+        self.resumed = set(pages)
+        self._checkpointed = set(pages)
+        return pages
+
+    def set_page_urls(self, page_urls: List[str]) -> None:
+        """
+        Set the discovered pages of the website.
+        """
+        self.page_urls = list(page_urls)
+        if self.checkpoint is not None:
+            self.checkpoint.start(self.page_urls)
+
+    def page_done(self, page_url: str, items: List[Dict]) -> None:
+        """
+        Record a scraped page.
+        """
+        self.done[page_url] = len(items)
+
+    def page_reported(self, page_url: str, items: List[Dict]) -> None:
+        """
+        Checkpoint a scraped page, once the consumer handled its items; an interrupted
+        run does not scrape (nor report) it again.
+        """
+        if self.checkpoint is not None and page_url not in self._checkpointed:
+            self.checkpoint.add_page(page_url, items)
+            self._checkpointed.add(page_url)
+
+    def page_failed(self, page_url: str, error: Exception) -> None:
+        """
+        Record a failed page.
+
+        Args:
+            page_url (str): url of the page.
+            error (Exception): the page error.
+        Raises:
+            ErrorBudgetExceeded: too many pages failed.
+        """
+        self.failed[page_url] = _reason(error)
+        if len(self.failed) > self.error_budget:
+            raise ErrorBudgetExceeded(
+                f"{len(self.failed)} pages failed (error budget: {self.error_budget})"
+            )
+
+    def abort(self, error: Exception) -> None:
+        """
+        Record the error that stopped the website.
+        """
+        self.error = _reason(error)
+
+    def missing_pages(self) -> Dict[str, str]:
+        """
+        Return the pages that were not scraped.
+
+        Returns:
+            missing (dict): page_url: reason.
+        """
+        missing = dict(self.failed)
+        not_scraped = f"not scraped ({self.error})" if self.error else "not scraped"
+        for page_url in self.page_urls:
+            if page_url not in self.done and page_url not in missing:
+                missing[page_url] = not_scraped
+        return missing
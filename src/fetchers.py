@@ -0,0 +1,360 @@
+"""
+Page fetching helpers.
+
+- AdaptiveRateLimiter: per-host token bucket that adapts its rate to the host responses.
+- prefetch: fetch upcoming pages in the background while earlier pages are being parsed.
+- fan_out: fetch many pages at once (bounded), yielding them in order.
+- merge_streams: run several generators in worker threads and yield their values as they arrive.
+- backoff_delay: jittered exponential backoff between retries.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from queue import Full, Queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+# responses that mean "slow down"
+THROTTLE_STATUSES = {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header (seconds or HTTP date).
+
+    Returns:
+        delay (float): seconds to wait (`None` if missing or invalid).
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0)
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token bucket, with an adaptive rate (AIMD).
+
+    - Each request takes a token; the tokens refill at the host rate, up to `burst` tokens.
+    - Every fast, successful response increases the rate by `increase` requests/second (up to `max_rate`).
+    - A 429/503 response or a connection error halves the rate (down to `min_rate`);
+        a response much slower than usual (`slow_factor` times the average latency) decreases it by 20%.
+    - A `Retry-After` header blocks the host for the given delay.
+    """
+
+    # the effective rate of a host is not reported over a shorter window (seconds)
+    MIN_RATE_WINDOW = 1
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: float = 1,
+        increase: float = 0.1,
+        slow_factor: float = 2,
+    ) -> None:
+        """
+        Args:
+            rate (float): initial requests/second per host.
+            min_rate (float): minimum requests/second per host.
+            max_rate (float): maximum requests/second per host.
+            burst (float): maximum number of requests sent at once to an idle host.
+            increase (float): rate increase per successful response.
+            slow_factor (float): latency, relative to the host average, considered as a slowdown.
+        """
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.slow_factor = slow_factor
+        self._hosts = dict()  # host: state
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> dict:
+        host = urlsplit(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            now = time.monotonic()
+            state = self._hosts[host] = {
+                "rate": self.initial_rate,
+                "tokens": self.burst,
+                "updated_at": now,
+                "blocked_until": now,
+                "latency": None,  # moving average
+                "requests": 0,
+                "throttle_events": 0,
+                "first_request_at": None,  # first send
+                "last_response_at": None,
+            }
+        return state
+
+    def reserve(self, url: str) -> float:
+        """
+        Reserve a request to the url's host.
+
+        Args:
+            url (str): url to request.
+        Returns:
+            delay (float): seconds to wait before sending the request.
+        """
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            state["tokens"] = min(
+                self.burst,
+                state["tokens"] + (now - state["updated_at"]) * state["rate"],
+            )
+            state["updated_at"] = now
+            state["tokens"] -= 1  # negative tokens are queued requests
+
+            delay = max(
+                -state["tokens"] / state["rate"], state["blocked_until"] - now, 0
+            )
+            state["requests"] += 1
+            if state["first_request_at"] is None:
+                state["first_request_at"] = now + delay
+        return delay
+
+    def wait(self, url: str) -> None:
+        """
+        Block until a request to the url's host is allowed.
+
+        Args:
+            url (str): url to request.
+        Returns:
+            None
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(
+        self,
+        url: str,
+        status_code: Optional[int],
+        latency: float,
+        retry_after: Optional[str] = None,
+    ) -> None:
+        """
+        Adapt the host rate to a response.
+
+        Args:
+            url (str): requested url.
+            status_code (int): response status code (`None` for a connection error).
+            latency (float): seconds to get the response.
+            retry_after (str): `Retry-After` header of the response, if any.
+        Returns:
+            None
+        """
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            state["last_response_at"] = now
+            average = state["latency"]
+
+            if status_code is None or status_code in THROTTLE_STATUSES:
+                state["rate"] = max(state["rate"] / 2, self.min_rate)
+                state["throttle_events"] += 1
+            elif average is not None and latency > self.slow_factor * average:
+                state["rate"] = max(state["rate"] * 0.8, self.min_rate)
+                state["throttle_events"] += 1
+            elif status_code < 400:
+                state["rate"] = min(state["rate"] + self.increase, self.max_rate)
+
+            delay = parse_retry_after(retry_after)
+            if delay:
+                state["blocked_until"] = max(state["blocked_until"], now + delay)
+                state["tokens"] = min(state["tokens"], 0)
+
+            if status_code is not None:
+                state["latency"] = (
+                    latency if average is None else 0.8 * average + 0.2 * latency
+                )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the rate statistics per host.
+
+        Returns:
+            stats (dict): host: requests, effective rate (requests/second, from the first
+                request sent to the last response; `None` over less than `MIN_RATE_WINDOW`),
+                current rate limit (requests/second) and number of throttle events.
+        """
+        with self._lock:
+            stats = dict()
+            for host, state in self._hosts.items():
+                elapsed = 0
+                if state["first_request_at"] and state["last_response_at"]:
+                    elapsed = state["last_response_at"] - state["first_request_at"]
+                stats[host] = {
+                    "requests": state["requests"],
+                    "rate": (
+                        (state["requests"] - 1) / elapsed
+                        if elapsed >= self.MIN_RATE_WINDOW
+                        else None
+                    ),
+                    "rate_limit": state["rate"],
+                    "throttle_events": state["throttle_events"],
+                }
+            return stats
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 60) -> float:
+    """
+    Return the delay before a retry: `base * 2 ** (attempt - 1)` seconds (at most `cap`), +/- 50% jitter.
+
+    Args:
+        attempt (int): retry number, starting at 1.
+        base (float): delay of the first retry.
+        cap (float): maximum delay, before the jitter.
+    Returns:
+        delay (float): seconds to wait.
+    """
+    return min(base * 2 ** (attempt - 1), cap) * random.uniform(0.5, 1.5)
+
+
+def _fetch_in_order(
+    fetch: Callable[[str], Any],
+    urls: Iterable[str],
+    max_workers: int,
+    window: int,
+    thread_name_prefix: str,
+) -> Iterator[Any]:
+    """
+    Fetch urls `max_workers` at a time, at most `window` pages ahead of the consumer
+    (being fetched, or fetched and not consumed yet), and yield the responses in order.
+    """
+    urls = iter(urls)
+    pending = deque()
+
+    with ThreadPoolExecutor(
+        max_workers=max(max_workers, 1), thread_name_prefix=thread_name_prefix
+    ) as executor:
+        try:
+            for url in urls:
+                pending.append(executor.submit(fetch, url))
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                response = pending.popleft().result()
+                next_url = next(urls, None)
+                if next_url is not None:
+                    pending.append(executor.submit(fetch, next_url))
+                yield response
+        finally:
+            # the consumer stopped early (error or break); drop the queued pages
+            for future in pending:
+                future.cancel()
+
+
+def prefetch(
+    fetch: Callable[[str], Any], urls: Iterable[str], lookahead: int = 2
+) -> Iterator[Any]:
+    """
+    Fetch urls in the background, at most `lookahead` pages ahead of the consumer.
+
+    Args:
+        fetch (callable): function that fetches a single url.
+        urls (iterable): urls to fetch.
+        lookahead (int): maximum number of pages fetched ahead (default 2).
+    Returns:
+        responses (iterator): fetched responses, in the same order as `urls`.
+    """
+    return _fetch_in_order(fetch, urls, lookahead, max(lookahead, 1), "prefetch")
+
+
+def fan_out(
+    fetch: Callable[[str], Any],
+    urls: Iterable[str],
+    max_workers: int,
+    window: int = None,
+) -> Iterator[Any]:
+    """
+    Fetch the urls `max_workers` at a time, ahead of the consumer, up to `window` pages
+    fetched and not consumed yet (the pages bodies held in memory).
+
+    Args:
+        fetch (callable): function that fetches a single url.
+        urls (iterable): urls to fetch.
+        max_workers (int): maximum number of urls fetched at the same time.
+        window (int): maximum number of pages ahead of the consumer (default twice `max_workers`).
+    Returns:
+        responses (iterator): fetched responses, in the same order as `urls`.
+    """
+    window = window or 2 * max(max_workers, 1)
+    return _fetch_in_order(fetch, urls, max_workers, window, "fan_out")
+
+
+def merge_streams(
+    generate: Callable[[Any], Iterable[Any]],
+    args: Iterable[Any],
+    max_workers: int,
+    maxsize: int = 0,
+) -> Iterator[Any]:
+    """
+    Run `generate(arg)` for every arg, `max_workers` at a time, and yield
+    the generated values as soon as they are produced.
+
+    Args:
+        generate (callable): generator function, called once per arg.
+        args (iterable): arguments of the generators.
+        max_workers (int): maximum number of generators running at the same time.
+        maxsize (int): maximum number of values waiting for the consumer (default 0; unbounded).
+    Returns:
+        values (iterator): generated values, in arrival order.
+    """
+    values = Queue(maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def put(value) -> bool:
+        # don't block forever on a consumer that stopped
+        while not stop.is_set():
+            try:
+                values.put(value, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def run(arg) -> None:
+        try:
+            for value in generate(arg):
+                if not put(value):
+                    return
+        finally:
+            put(done)
+
+    with ThreadPoolExecutor(
+        max_workers=max(max_workers, 1), thread_name_prefix="stream"
+    ) as executor:
+        futures = [executor.submit(run, arg) for arg in args]
+        try:
+            remaining = len(futures)
+            while remaining:
+                value = values.get()
+                if value is done:
+                    remaining -= 1
+                else:
+                    yield value
+            for future in futures:
+                future.result()  # raise the generators errors
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
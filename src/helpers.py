@@ -2,6 +2,7 @@
 Helper functions.
 """
 
+from functools import lru_cache
 import os
 from typing import List
 from pathlib import Path
@@ -12,10 +13,10 @@ from datetime import datetime, timezone
 import pandas as pd
 
 
-from telegram_bot_utils import TelegramBot
 from constants import DATA_DIR, DATA_FILE_NAME, DATA_COLUMNS
+from prices import parse_price
 
-telegram_bot = TelegramBot()
+_DOMAIN_PATTERN = re.compile(r"^(?:http:\/\/|www\.|https:\/\/)([^\/]+)")
 
 
 def load_data(
@@ -114,7 +115,7 @@ def update_item_price(
 
 def extract_price(text_price: str = None, thousands_comma_separator=False) -> float:
     """
-    Using regex; extract price from a text.
+    Extract price from a text (see `prices.parse_price`).
 
     Args:
         text_price (str): The text that contains the price.
@@ -124,18 +125,10 @@ def extract_price(text_price: str = None, thousands_comma_separator=False) -> fl
         extracted_price (float): The extracted price.
 
     """
-    if not text_price:
-        return 0
-
-    if thousands_comma_separator:
-        text_price = text_price.replace(",", "")
-
-    pattern = r"(\d+(?:\.\d+)?)"
-    extracted_price = re.findall(pattern, text_price.replace(",", "."))
-
-    return float(extracted_price[0]) if extracted_price else float(0)
+    return parse_price(text_price, thousands_comma_separator)
 
 
+@lru_cache(maxsize=128)
 def get_domain_name(url: str = None) -> str:
     """
     Using regex; extract domain name.
@@ -145,9 +138,7 @@ def get_domain_name(url: str = None) -> str:
     Returns:
         domain (str): Extracted domain name.
     """
-    pattern = r"^(?:http:\/\/|www\.|https:\/\/)([^\/]+)"
-
-    return re.findall(pattern, url)[0].strip("www.")
+    return _DOMAIN_PATTERN.findall(url)[0].strip("www.")
 
 
 def updated_datetime(now=datetime.now(tz=timezone.utc)) -> datetime:
@@ -0,0 +1,138 @@
+"""
+Shared HTTP client.
+
+One `requests.Session` for all the scrappers, with a connection pool per host,
+keep-alive and compressed responses. It counts the socket connections it opens to report
+how many requests reused an existing connection.
+"""
+
+import threading
+from typing import Dict, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from constants import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT
+
+try:  # urllib3 decodes brotli responses only when a brotli package is installed
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+
+class _ConnectionCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def increment(self) -> None:
+        with self._lock:
+            self.count += 1
+
+
+def _counting_pool(pool_class, counter: _ConnectionCounter):
+    """
+    Create a connection pool class that counts the socket connections it opens:
+    the new connections, and the reconnections of the dropped pooled connections.
+    """
+
+    class CountingConnection(pool_class.ConnectionCls):
+        def connect(self):
+            super().connect()
+            counter.increment()
+
+    class CountingPool(pool_class):
+        ConnectionCls = CountingConnection
+
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, counter: _ConnectionCounter, **kwargs) -> None:
+        self.counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.counter),
+            "https": _counting_pool(HTTPSConnectionPool, self.counter),
+        }
+
+
+class HttpClient:
+    def __init__(
+        self,
+        headers: Dict = None,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        timeout: Union[float, Tuple[float, float]] = HTTP_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            headers (dict): default headers sent with every request.
+            pool_connections (int): number of hosts to keep a connection pool for.
+            pool_maxsize (int): maximum number of kept-alive connections per host.
+            timeout (float|tuple): request timeout in seconds, or (connect, read) timeouts.
+        """
+        self.timeout = timeout
+        self.num_of_requests = 0
+        self._connections = _ConnectionCounter()
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+        if headers:
+            self.session.headers.update(headers)
+
+        adapter = _CountingAdapter(
+            self._connections,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request through the shared session.
+
+        Args:
+            url (str): url to request.
+            **kwargs: extra arguments for `requests.Session.get`.
+        Returns:
+            res (requests.Response): the response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.num_of_requests += 1
+        return self.session.get(url, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the connections reuse statistics.
+
+        Returns:
+            stats (dict): number of requests, opened socket connections and reused connections
+                (the requests sent without opening one).
+        """
+        new_connections = self._connections.count
+        return {
+            "requests": self.num_of_requests,
+            "new_connections": new_connections,
+            "reused_connections": max(self.num_of_requests - new_connections, 0),
+        }
+
+    def close(self) -> None:
+        """
+        Close all the pooled connections.
+        """
+        self.session.close()
@@ -0,0 +1,254 @@
+"""
+In-memory items store, indexed by item key (the item title).
+
+The items are kept in a dataframe indexed by item key, so lookups are hash
+lookups and a whole run of scraped items is reconciled in one batch of
+vectorized operations. The store is loaded from and flushed back to the
+data file schema (`DATA_COLUMNS`).
+
+The rows added by every batch (`merge`, `reconcile`) are kept in their own small
+frames, and concatenated once, on the next access to `ItemStore.frame` (e.g. `save`):
+a batch costs the size of the batch, not of the store.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from constants import DATA_COLUMNS
+
+# reconcile statuses
+NEW = "new"
+PRICE_DOWN = "price_down"
+PRICE_UP = "price_up"
+UNCHANGED = "unchanged"
+
+
+def item_key(item_data: Dict) -> str:
+    """
+    Return the key that identifies an item.
+
+    Args:
+        item_data (dict): item data.
+    Returns:
+        key (str): item key.
+    """
+    return item_data.get("item_title")
+
+
+class ItemStore:
+    def __init__(self, frame: pd.DataFrame = None) -> None:
+        """
+        Args:
+            frame (dataframe): items indexed by key, with the other `DATA_COLUMNS` columns.
+        """
+        if frame is None:
+            frame = pd.DataFrame(columns=DATA_COLUMNS).set_index("item_title")
+        self._frame = frame
+        # frames of the added rows, not concatenated yet; key -> (frame number, row)
+        self._added = list()
+        self._added_rows = dict()
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        The items, indexed by key (the added rows are concatenated first).
+        """
+        if self._added:
+            frames = [self._frame] if len(self._frame) else list()
+            self._frame = pd.concat(frames + self._added)
+            self._added = list()
+            self._added_rows = dict()
+        return self._frame
+
+    def _add(self, frame: pd.DataFrame) -> None:
+        """
+        Add new items (not in the store) to the store.
+        """
+        if not len(frame):
+            return
+        frame_no = len(self._added) + 1
+        self._added.append(frame)
+        self._added_rows.update(
+            (key, (frame_no, row)) for row, key in enumerate(frame.index)
+        )
+
+    def _frame_no(self, frame_no: int) -> pd.DataFrame:
+        return self._frame if frame_no == 0 else self._added[frame_no - 1]
+
+    def _locate(self, keys: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows of items.
+
+        Args:
+            keys (index): keys of the items.
+        Returns:
+            frame_nos (array): frame of every item (0 the main frame, then the added frames; -1 not in the store).
+            rows (array): row of every item in its frame.
+        """
+        rows = self._frame.index.get_indexer(keys)
+        frame_nos = np.where(rows >= 0, 0, -1)
+        if self._added_rows:
+            for i, key in enumerate(keys):
+                location = self._added_rows.get(key)
+                if location is not None:
+                    frame_nos[i], rows[i] = location
+        return frame_nos, rows
+
+    def _get_values(
+        self, frame_nos: np.ndarray, rows: np.ndarray, column: str
+    ) -> np.ndarray:
+        """
+        Read a column of located items (NaN for the items that are not in the store).
+        """
+        values = np.full(len(rows), np.nan)
+        for frame_no in np.unique(frame_nos[frame_nos >= 0]):
+            selected = frame_nos == frame_no
+            values[selected] = self._frame_no(frame_no)[column].to_numpy()[
+                rows[selected]
+            ]
+        return values
+
+    def _set_values(
+        self, frame_nos: np.ndarray, rows: np.ndarray, column: str, values
+    ) -> None:
+        """
+        Write a column of located items, in place.
+        """
+        for frame_no in np.unique(frame_nos):
+            selected = frame_nos == frame_no
+            frame = self._frame_no(frame_no)
+            frame.iloc[rows[selected], frame.columns.get_loc(column)] = (
+                values if np.isscalar(values) else values[selected]
+            )
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame) -> "ItemStore":
+        """
+        Build a store from a dataframe of items (the first row of a duplicated item is kept).
+
+        Args:
+            dataframe (dataframe): dataframe of the items.
+        Returns:
+            store (ItemStore): the items store.
+        """
+        dataframe = dataframe.drop_duplicates(subset="item_title", keep="first")
+        if "updated_at" in dataframe.columns:
+            # older runs wrote the update time to `updated_at`
+            dataframe = dataframe.assign(
+                updated_on=dataframe["updated_at"].fillna(dataframe["updated_on"])
+            )
+
+        frame = dataframe.reindex(columns=DATA_COLUMNS).set_index("item_title")
+        frame["item_price"] = pd.to_numeric(frame["item_price"], errors="coerce")
+        # empty date columns are read as floats
+        frame[["added_on", "updated_on"]] = frame[["added_on", "updated_on"]].astype(
+            object
+        )
+        return cls(frame)
+
+    def merge(self, dataframe: pd.DataFrame) -> None:
+        """
+        Add stored items to the store (the items that are already in the store are kept as they are).
+
+        Args:
+            dataframe (dataframe): dataframe of the items.
+        Returns:
+            None
+        """
+        frame = ItemStore.from_dataframe(dataframe).frame
+        frame_nos, _ = self._locate(frame.index)
+        self._add(frame[frame_nos < 0])
+
+    def to_dataframe(self, keys: Iterable[str] = None) -> pd.DataFrame:
+        """
+        Return the items as a dataframe with the `DATA_COLUMNS` columns.
+
+        Args:
+            keys (iterable): keys of the items to return (default all the items).
+        Returns:
+            data (pd.DataFrame): the items.
+        """
+        frame = self.frame if keys is None else self.frame.loc[list(keys)]
+        return frame.reset_index().reindex(columns=DATA_COLUMNS)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._added_rows or key in self._frame.index
+
+    def __len__(self) -> int:
+        return len(self._frame) + len(self._added_rows)
+
+    def get_price(self, key: str) -> float:
+        """
+        Get an item's existing price.
+
+        Args:
+            key (str): item key.
+        Returns:
+            item_price (float): Item price (0.0 if the item doesn't exist).
+        """
+        frame_nos, rows = self._locate(pd.Index([key]))
+        if frame_nos[0] < 0:
+            return 0.0
+        return self._frame_no(frame_nos[0])["item_price"].iat[rows[0]]
+
+    def reconcile(
+        self, scraped_items: List[Dict], added_on: str, updated_on: str
+    ) -> pd.DataFrame:
+        """
+        Diff the scraped items against the stored items, then apply all the
+        price updates and inserts in bulk.
+
+        Args:
+            scraped_items (list): scraped items (item_title, item_price, item_url).
+            added_on (str): adding time of the new items.
+            updated_on (str): update time of the updated items.
+        Returns:
+            changes (dataframe): the new and updated items, in scraping order, with the columns:
+                item_title, item_url, item_old_price, item_new_price,
+                status (`NEW`, `PRICE_DOWN` or `PRICE_UP`).
+        """
+        scraped = (
+            pd.DataFrame(
+                scraped_items, columns=["item_title", "item_price", "item_url"]
+            )
+            .drop_duplicates(subset="item_title", keep="first")
+            .set_index("item_title")
+        )
+        new_price = scraped["item_price"]
+        frame_nos, rows = self._locate(scraped.index)
+        old_price = pd.Series(
+            self._get_values(frame_nos, rows, "item_price"), index=scraped.index
+        )
+
+        exists = frame_nos >= 0
+        changed = exists & (new_price != old_price).to_numpy()
+        status = np.select(
+            [~exists, changed & (old_price > new_price).to_numpy(), changed],
+            [NEW, PRICE_DOWN, PRICE_UP],
+            default=UNCHANGED,
+        )
+
+        # bulk update
+        self._set_values(
+            frame_nos[changed],
+            rows[changed],
+            "item_price",
+            new_price.to_numpy()[changed],
+        )
+        self._set_values(frame_nos[changed], rows[changed], "updated_on", updated_on)
+
+        # bulk insert
+        new_items = scraped[status == NEW].assign(added_on=added_on, updated_on=None)
+        self._add(new_items.reindex(columns=self._frame.columns))
+
+        changes = pd.DataFrame(
+            {
+                "item_url": scraped["item_url"],
+                "item_old_price": old_price,
+                "item_new_price": new_price,
+                "status": status,
+            }
+        )
+        return changes[changes["status"] != UNCHANGED].reset_index()
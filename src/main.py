@@ -1,120 +1,188 @@
 """
 Main logic
 """
+
 import time
-import pandas as pd
-
-from helpers import (
-    load_data,
-    save_data,
-    list_existing_items,
-    get_item_price,
-    update_item_price,
-    get_elapsed_time,
-)
 
-from scrappers import Scrapper
-from constants import DATA_COLUMNS, SEND_ALL_UPDATES, SEND_NEW_ITEMS
+from helpers import get_elapsed_time, updated_datetime
+from item_store import ItemStore, NEW, item_key
+from storage import get_storage
+
+from scrappers import Scrapper, NOT_MODIFIED, UNCHANGED, PARSED, RESUMED
+from constants import (
+    SEND_ALL_UPDATES,
+    SEND_NEW_ITEMS,
+    RUN_CONCURRENTLY,
+    MAX_CONCURRENT_WEBSITES,
+    SCRAPPING_BACKEND,
+    STORAGE_BACKEND,
+)
 from telegram_bot_utils import TelegramBot
 
-telegram_bot = TelegramBot()
+# missing pages listed per website in the run report
+MAX_REPORTED_PAGES = 10
+
+
+def report_changes(changes, telegram_bot: TelegramBot) -> None:
+    """
+    Send the notifications of the new and updated items (see `ItemStore.reconcile`).
+    """
+    for change in changes.itertuples(index=False):
+        if change.status == NEW:
+            if SEND_NEW_ITEMS:
+                telegram_bot.send_new_item_added(
+                    item_title=change.item_title,
+                    item_url=change.item_url,
+                    item_price=change.item_new_price,
+                )
+        else:
+            # change send_all_updates to `true` to get all updated items prices
+            # false for only decreased prices.
+            telegram_bot.send_price_update(
+                item_title=change.item_title,
+                item_url=change.item_url,
+                item_old_price=change.item_old_price,
+                item_new_price=change.item_new_price,
+                send_all_updates=SEND_ALL_UPDATES,
+            )
+    # send the batched notifications of the page
+    telegram_bot.flush()
+
+
+def format_missing_pages(missing_pages) -> str:
+    """
+    Format the missing pages report (see `Scrapper.missing_pages`).
+    """
+    lines = ["Missing pages:"]
+    for site_name, site_missing in missing_pages.items():
+        lines.append(f"{site_name} ({len(site_missing)}):")
+        for page_url, reason in list(site_missing.items())[:MAX_REPORTED_PAGES]:
+            lines.append(f"    - {page_url}: {reason}")
+        if len(site_missing) > MAX_REPORTED_PAGES:
+            lines.append(f"    - ... {len(site_missing) - MAX_REPORTED_PAGES} more.")
+    return "\n".join(lines)
+
+
+def format_rate(rate) -> str:
+    """
+    Format a requests rate (see `AdaptiveRateLimiter.stats`); "-" if it was not measured.
+    """
+    return "-" if rate is None else f"{rate:.2f}/s"
+
 
 if __name__ == "__main__":
     import os
 
     os.system("cls || clear")
 
-    # load existing items data
-    existing_items_df = load_data()
-    existing_items = list_existing_items(existing_items_df)
-    telegram_bot.send_alert(f"Loaded {len(existing_items)} existing items.")
+    # created here, not at import: the parse workers import this module too
+    telegram_bot = TelegramBot()
+
+    # existing items data
+    storage = get_storage(STORAGE_BACKEND)
+    telegram_bot.send_alert(f"Loaded {storage.count()} existing items.")
 
-    updated_items_df = existing_items_df.copy()
     now = time.time()
-    scraped_items = list()
 
     # telegram_bot.send_alert(f"Start scraping...")
 
     ### SCRAPPERS
-    # comment a line to enable/disable/update a certain website
-    scrappers = Scrapper()
-    ### 1st website:
-    scraped_items.extend(scrappers.scrape_plaidonline())
-
-    ### 2nd website:
-    scraped_items.extend(scrappers.scrape_enasco())
-
-    ### 3rd website:
-    scraped_items.extend(scrappers.scrape_nordstromrack())
-
-    ### 4th website:
-    scraped_items.extend(scrappers.scrape_altomusic())
-
-    ### 5th website:
-    scraped_items.extend(scrappers.scrape_muscleandstrength())
-
-    ### 6th website:
-    scraped_items.extend(scrappers.scrape_camerareadycosmetics())
-
-    ### 7th website:
-    scraped_items.extend(scrappers.scrape_officesupply())
-
-    ### 8th website:
-    scraped_items.extend(scrappers.scrape_gamestop())
-
-    ### 9th website:
-    scraped_items.extend(scrappers.scrape_scheels())
-
-    ### 10th website:
-    scraped_items.extend(scrappers.scrape_academy())
-
-    ### 11th website:
-    scraped_items.extend(scrappers.scrape_4sgm())
-
-    ### check/updated items
-    new_items_count = 0
-    updated_items_count = 0
-    for item_data in scraped_items:
-        if (item_title := item_data.get("item_title")) in existing_items:
-            item_url = item_data.get("item_url")
-            item_new_price = item_data.get("item_price")
-            item_old_price = get_item_price(updated_items_df, item_title)
-
-            if item_new_price != item_old_price:
-                updated_items_count += 1
-                update_item_price(updated_items_df, item_title, item_new_price)
-                # change send_all_updates to `true` to get all updated items prices
-                # false for only decreased prices.
-                telegram_bot.send_price_update(
-                    item_title=item_title,
-                    item_url=item_url,
-                    item_old_price=item_old_price,
-                    item_new_price=item_new_price,
-                    send_all_updates=SEND_ALL_UPDATES,
-                )
+    if SCRAPPING_BACKEND == "asyncio":
+        from async_scrappers import AsyncScrapper
 
-        else:
-            new_items_count += 1
-            item_data.update(added_on=str(now))
-            updated_items_df = pd.concat(
-                [updated_items_df, pd.DataFrame([item_data], columns=DATA_COLUMNS),]
-            )
-            # report to telegram
-            if SEND_NEW_ITEMS:
-                item_data.get("item_title")
-                item_url = item_data.get("item_url")
-                item_price = item_data.get("item_price")
-                telegram_bot.send_new_item_added(
-                    item_title=item_title, item_url=item_url, item_price=item_price,
-                )
+        scrappers = AsyncScrapper()
+    else:
+        scrappers = Scrapper()
+
+    # comment a line to enable/disable/update a certain website
+    websites = [
+        ### 1st website:
+        "plaidonline",
+        ### 2nd website:
+        "enasco",
+        ### 3rd website:
+        "nordstromrack",
+        ### 4th website:
+        "altomusic",
+        ### 5th website:
+        "muscleandstrength",
+        ### 6th website:
+        "camerareadycosmetics",
+        ### 7th website:
+        "officesupply",
+        ### 8th website:
+        "gamestop",
+        ### 9th website:
+        "scheels",
+        ### 10th website:
+        "academy",
+        ### 11th website:
+        "4sgm",
+    ]
+    item_store = ItemStore()
+    scraped_keys = set()
+    changed_keys = list()
+    new_items_count = updated_items_count = 0
+
+    # reconcile and report every page as soon as it is scraped
+    for page in scrappers.iter_websites(
+        websites, max_workers=MAX_CONCURRENT_WEBSITES if RUN_CONCURRENTLY else 1
+    ):
+        # the first occurrence of an item in the run wins; the pages come in the
+        # websites order, so the same item wins as in a sequential run
+        scraped_items = [
+            item for item in page.items if item_key(item) not in scraped_keys
+        ]
+        scraped_keys.update(item_key(item) for item in scraped_items)
+
+        ### check/updated items
+        # load only the stored items that were scraped
+        item_store.merge(storage.load(keys=[item_key(item) for item in scraped_items]))
+        changes = item_store.reconcile(
+            scraped_items, added_on=str(now), updated_on=str(updated_datetime())
+        )
+        batch_new_items_count = int((changes["status"] == NEW).sum())
+        new_items_count += batch_new_items_count
+        updated_items_count += len(changes) - batch_new_items_count
+        changed_keys.extend(changes["item_title"])
+
+        # the pages resumed from a checkpoint were reported by the interrupted run
+        if not page.resumed:
+            report_changes(changes, telegram_bot)
+        # checkpointed only once reported; an interrupted run resumes after it
+        scrappers.checkpoint_page(page)
 
     ### Save data
-    save_data(updated_items_df)
+    storage.save(item_store, changed_keys)
+    storage.close()
+    # the items are saved; the next run starts over
+    scrappers.clear_checkpoints()
 
     # report to telegram
+    telegram_bot.send_digest()
     telegram_bot.send_new_items_added(new_items_count)
     telegram_bot.send_new_items_updated(updated_items_count)
+    http_stats = scrappers.http_stats()
+    page_stats = scrappers.page_stats()
+    missing_pages = scrappers.missing_pages()
+    rate_stats = scrappers.rate_stats()
+    scrappers.close()
     telegram_bot.send_success(
         f"Total elapsed time: {get_elapsed_time(start_time=now)} seconds."
         f"\nScrapped {scrappers.num_of_websites} website/s."
+        f"\nSent {http_stats['requests']} requests over {http_stats['new_connections']} connections"
+        f" ({http_stats['reused_connections']} reused)."
+        f"\nPages not modified/unchanged/parsed/resumed:"
+        + "".join(
+            f"\n    - {site_name}: {site_stats[NOT_MODIFIED]}/{site_stats[UNCHANGED]}/{site_stats[PARSED]}/{site_stats[RESUMED]}"
+            for site_name, site_stats in page_stats.items()
+        )
+        + f"\nRequests rate (limit), throttle events:"
+        + "".join(
+            f"\n    - {host}: {format_rate(host_stats['rate'])} ({format_rate(host_stats['rate_limit'])}), {host_stats['throttle_events']}"
+            for host, host_stats in rate_stats.items()
+        )
     )
+    if missing_pages:
+        telegram_bot.send_error(format_missing_pages(missing_pages))
+    telegram_bot.close()
@@ -0,0 +1,104 @@
+"""
+On-disk cache of the listing pages, for conditional requests.
+
+For every fetched page that has validators (`ETag` and/or `Last-Modified` response headers),
+the validators and the extracted items are stored, keyed by the page url:
+    <data_dir>/<cache_dir>/<sha1(url)>.json
+
+The next request of the page sends `If-None-Match`/`If-Modified-Since`;
+a `304 Not Modified` response reuses the stored items, without parsing the page.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Dict, List, Mapping, Optional
+
+from constants import DATA_DIR, PAGE_CACHE_DIR_NAME, USE_PAGE_CACHE
+
+
+class PageCache:
+    def __init__(
+        self,
+        data_dir: str = DATA_DIR,
+        cache_dir_name: str = PAGE_CACHE_DIR_NAME,
+        enabled: bool = USE_PAGE_CACHE,
+    ) -> None:
+        """
+        Args:
+            data_dir (str): Data directory (default /data)
+            cache_dir_name (str): Name of the cache directory (default page_cache)
+            enabled (bool): `False` to never send conditional requests nor store pages.
+        """
+        self.root = os.path.join(
+            Path(__file__).parent.resolve(), data_dir, cache_dir_name
+        )
+        self.enabled = enabled
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.root, f"{hashlib.sha1(url.encode()).hexdigest()}.json")
+
+    def _read(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Return the conditional request headers of a cached page (empty if not cached).
+
+        Args:
+            url (str): page url.
+        Returns:
+            headers (dict): `If-None-Match` and/or `If-Modified-Since` headers.
+        """
+        entry = self._read(url) if self.enabled else None
+        if not entry:
+            return dict()
+
+        headers = dict()
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_items(self, url: str) -> Optional[List[Dict]]:
+        """
+        Return the stored items of a page (`None` if not cached).
+        """
+        entry = self._read(url)
+        return entry["items"] if entry else None
+
+    def put(self, url: str, headers: Mapping[str, str], items: List[Dict]) -> None:
+        """
+        Store the items of a page, if its response has validators.
+
+        Args:
+            url (str): page url.
+            headers (mapping): response headers.
+            items (list): extracted items of the page.
+        Returns:
+            None
+        """
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not self.enabled or not (etag or last_modified):
+            return
+
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "items": items,
+        }
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)  # atomic; readers never see a partial entry
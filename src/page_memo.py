@@ -0,0 +1,170 @@
+"""
+Persistent memo of the extracted items, keyed by page fingerprint.
+
+Many websites ignore conditional requests and send the same products grid again.
+A page fingerprint is a hash of the part of the page the items are extracted
+from, plus the extraction code; a page with a known fingerprint is not parsed again.
+The items part runs from the website `items_marker` to its `items_end_marker`
+(after the last items marker, default the end of the page), without the scripts,
+styles and comments: the parts of a page (tokens, timestamps, analytics ids)
+that change on every request.
+
+The memo is an SQLite database, bounded to `max_entries` pages (plus `EVICTION_SLACK`
+between two evictions); the least recently used pages are evicted.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from constants import DATA_DIR, PAGE_MEMO_FILE_NAME, PAGE_MEMO_MAX_ENTRIES
+from sites import SITES
+
+# extraction code version; a change of the websites definitions invalidates the memo
+_CODE_VERSION = hashlib.blake2b(
+    b"".join(
+        (Path(__file__).parent / file_name).read_bytes()
+        for file_name in ("sites.py", "site_specs.py", "parsing.py")
+    ),
+    digest_size=8,
+).digest()
+
+# the volatile parts of a page, which no items field reads
+_VOLATILE_PATTERN = re.compile(
+    rb"<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->",
+    re.DOTALL | re.IGNORECASE,
+)
+
+# share of `max_entries` that may be inserted above it before the next eviction
+EVICTION_SLACK = 0.1
+
+
+def fingerprint(site_name: str, content: bytes) -> str:
+    """
+    Return the fingerprint of the items part of a website page.
+
+    Args:
+        site_name (str): name of the website (key of `sites.SITES`).
+        content (bytes): raw page content.
+    Returns:
+        fingerprint (str): hex digest.
+    """
+    site = SITES[site_name]
+    marker = site.get("items_marker")
+    if marker and marker in content:
+        start = content.find(marker)
+        end_marker = site.get("items_end_marker")
+        end = content.find(end_marker, content.rfind(marker)) if end_marker else -1
+        items_part = content[start:] if end < 0 else content[start:end]
+    else:
+        items_part = content
+
+    if site.get("json_items") is None:  # structured data is read from the scripts
+        items_part = _VOLATILE_PATTERN.sub(b"", items_part)
+
+    digest = hashlib.blake2b(_CODE_VERSION, digest_size=20)
+    digest.update(site_name.encode())
+    digest.update(items_part)
+    return digest.hexdigest()
+
+
+class PageMemo:
+    def __init__(
+        self,
+        data_dir: str = DATA_DIR,
+        file_name: str = PAGE_MEMO_FILE_NAME,
+        max_entries: int = PAGE_MEMO_MAX_ENTRIES,
+    ) -> None:
+        """
+        Args:
+            data_dir (str): Data directory (default /data)
+            file_name (str): Name of the memo database file (default page_memo.db)
+            max_entries (int): Maximum number of memoized pages; `0` disables the memo.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.connection = None
+        if not max_entries:
+            return
+
+        full_dir_path = os.path.join(Path(__file__).parent.resolve(), data_dir)
+        os.makedirs(full_dir_path, exist_ok=True)
+        # shared by the fetching threads, under the lock
+        self.connection = sqlite3.connect(
+            os.path.join(full_dir_path, file_name), check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages "
+            "(fingerprint TEXT PRIMARY KEY, items TEXT, used_at REAL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS pages_used_at ON pages (used_at)"
+        )
+        # a run that didn't close the memo left it above `max_entries`
+        with self._lock, self.connection:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Evict the least recently used pages above `max_entries` (under the lock).
+        """
+        self.connection.execute(
+            "DELETE FROM pages WHERE fingerprint NOT IN "
+            "(SELECT fingerprint FROM pages ORDER BY used_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._size = self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """
+        Return the memoized items of a page fingerprint (`None` if unknown).
+        """
+        if self.connection is None:
+            return None
+
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT items FROM pages WHERE fingerprint = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE pages SET used_at = ? WHERE fingerprint = ?",
+                (time.time(), key),
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, items: List[Dict]) -> None:
+        """
+        Memoize the items of a page fingerprint.
+        """
+        if self.connection is None:
+            return
+
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?)",
+                (key, json.dumps(items), time.time()),
+            )
+            self._size += 1  # or a replaced page; recounted by the eviction
+            if self._size > self.max_entries * (1 + EVICTION_SLACK):
+                self._evict()
+
+    def close(self) -> None:
+        """
+        Evict the least recently used pages above `max_entries`, and close the memo.
+        """
+        if self.connection is None:
+            return
+
+        with self._lock, self.connection:
+            self._evict()
+        self.connection.close()
+        self.connection = None
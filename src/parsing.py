@@ -0,0 +1,233 @@
+"""
+HTML parsing stage.
+
+Turn raw pages (response bytes) into items, using the websites definitions in `sites.py`.
+The parsing runs in a process pool, so the fetching threads only do I/O
+and the parsing scales across the CPU cores.
+
+It can also replay stored pages through the websites extraction functions:
+    python parsing.py <site_name> <page.html> [<page.html> ...]
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+import json
+import multiprocessing
+import sys
+from typing import Callable, Dict, Iterable, List
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+from constants import PARSE_WORKERS, HTML_PARSER
+from sites import SITES
+
+# BeautifulSoup tree builders, fastest first
+PARSER_BACKENDS = ("lxml", "html.parser", "html5lib")
+FALLBACK_PARSER = "html.parser"
+
+# the parsing processes are started from a clean server process, not forked from the
+# scrapper: a fork while another thread holds a lock (stdout, logging, queues) can deadlock
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def make_soup(
+    content: bytes, parser: str = HTML_PARSER, parse_only: SoupStrainer = None
+) -> BeautifulSoup:
+    """
+    Build the tree of a page with the given parser backend.
+    Use "html.parser" if the backend is not installed.
+
+    Args:
+        content (bytes): raw page content.
+        parser (str): BeautifulSoup tree builder, one of `PARSER_BACKENDS`.
+        parse_only (SoupStrainer): build only the matching parts of the tree (default the whole page).
+    Returns:
+        soup (BeautifulSoup): the page tree.
+    """
+    try:
+        return BeautifulSoup(content, parser, parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(content, FALLBACK_PARSER, parse_only=parse_only)
+
+
+def site_parser(site_name: str) -> str:
+    """
+    Return the parser backend of a website (`parser` of its definition, default `HTML_PARSER`).
+    """
+    return SITES[site_name].get("parser", HTML_PARSER)
+
+
+def extract_items(site_name: str, content: bytes, parser: str = None) -> List[Dict]:
+    """
+    Extract the items of a website page.
+    The items are read from the page structured data if the website has `json_items`;
+    otherwise (or if the page has no such data) from its tree.
+    The pages of a JSON endpoint ("document" source) are only read as JSON: a page
+    without the products data raises, and is reported as a failed page.
+    Only the part of the page declared in the website `parse_only` is parsed.
+    If the page can't be extracted with the website parser (malformed page: an error, or
+    the `parse_only` part not found although the page has its `items_marker`),
+    parse it again with "html.parser"; a page without items is parsed once.
+
+    Args:
+        site_name (str): name of the website (key of `sites.SITES`).
+        content (bytes): raw page content.
+        parser (str): parser backend (default the website parser).
+    Returns:
+        items (list): list of the page's items.
+    """
+    site = SITES[site_name]
+    json_items = site.get("json_items")
+    if json_items is not None and json_items.source == "document":
+        # a JSON endpoint: there is no tree to fall back to; a bad page fails
+        items = json_items.extract(content, site["domain_name"])
+        if items is None:
+            raise ValueError("The page has no products data")
+        return items
+
+    if json_items is not None:
+        try:
+            items = json_items.extract(content, site["domain_name"])
+        except Exception:
+            items = None  # unexpected data; extract the items from the tree
+        if items is not None:
+            return items
+
+    parser = parser or site_parser(site_name)
+    parse_only = site.get("parse_only")
+
+    try:
+        soup = make_soup(content, parser, parse_only)
+        items = site["items"].extract(soup, site["domain_name"])
+        if (
+            items
+            or parser == FALLBACK_PARSER
+            or not _missed_items_part(site, soup, content)
+        ):
+            return items
+    except Exception:
+        if parser == FALLBACK_PARSER:
+            raise
+
+    soup = make_soup(content, FALLBACK_PARSER, parse_only)
+    return site["items"].extract(soup, site["domain_name"])
+
+
+def _missed_items_part(site: Dict, soup: BeautifulSoup, content: bytes) -> bool:
+    """
+    Whether the parser found none of the `parse_only` part of a page that has the website `items_marker`.
+    """
+    if site.get("parse_only") is None:
+        return False
+    marker = site.get("items_marker")
+    return soup.find() is None and (marker is None or marker in content)
+
+
+def discover_page_urls(
+    site_name: str, content: bytes, page_size: int = None
+) -> List[str]:
+    """
+    Find the urls of the pages to scrape from the first page of a website.
+
+    Args:
+        site_name (str): name of the website (key of `sites.SITES`).
+        content (bytes): raw content of the first page.
+        page_size (int): items per page, of the websites paginated by offsets (default the website's).
+    Returns:
+        page_urls (list): urls of the pages to scrape.
+    """
+    site = SITES[site_name]
+    soup = make_soup(content, site_parser(site_name))
+    return site["pagination"].page_urls(soup, site["base_url"], page_size)
+
+
+class _InlineExecutor:
+    """
+    Run the submitted functions right away, in the calling thread.
+    """
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+class ParsePool:
+    def __init__(self, max_workers: int = PARSE_WORKERS) -> None:
+        """
+        Args:
+            max_workers (int): number of parsing processes;
+                `None` for one per CPU core, `0` to parse in the calling thread.
+        """
+        if max_workers == 0:
+            self.executor = _InlineExecutor()
+        else:
+            self.executor = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=_MP_CONTEXT
+            )
+
+    def submit_items(self, site_name: str, content: bytes) -> Future:
+        """
+        Extract the items of a page in the pool.
+
+        Returns:
+            future (Future): future of the page's items.
+        """
+        return self.executor.submit(extract_items, site_name, content)
+
+    def submit_page_urls(
+        self, site_name: str, content: bytes, page_size: int = None
+    ) -> Future:
+        """
+        Find the pages urls from the first page in the pool.
+
+        Returns:
+            future (Future): future of the pages urls.
+        """
+        return self.executor.submit(discover_page_urls, site_name, content, page_size)
+
+    def shutdown(self) -> None:
+        """
+        Stop the parsing processes.
+        """
+        self.executor.shutdown(wait=True)
+
+
+def replay_pages(
+    site_name: str, paths: Iterable[str], max_workers: int = PARSE_WORKERS
+) -> List[Dict]:
+    """
+    Extract the items of stored pages of a website.
+
+    Args:
+        site_name (str): name of the website (key of `sites.SITES`).
+        paths (iterable): paths of the stored HTML pages.
+        max_workers (int): number of parsing processes (see `ParsePool`).
+    Returns:
+        items (list): list of the pages' items, in the same order as `paths`.
+    """
+    parse_pool = ParsePool(max_workers=max_workers)
+    try:
+        futures = list()
+        for path in paths:
+            with open(path, "rb") as f:
+                futures.append(parse_pool.submit_items(site_name, f.read()))
+        return [item for future in futures for item in future.result()]
+    finally:
+        parse_pool.shutdown()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in SITES:
+        print(f"Usage: python parsing.py <{'|'.join(SITES)}> <page.html> [...]")
+        sys.exit(1)
+
+    for item in replay_pages(sys.argv[1], sys.argv[2:]):
+        print(json.dumps(item))
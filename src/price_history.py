@@ -0,0 +1,176 @@
+"""
+Append-only price history store.
+
+Every run appends only the items that changed (new items and new prices) to a
+compressed Parquet dataset, partitioned by website and run date:
+    <data_dir>/<history_dir>/site=<domain>/run_date=<YYYY-MM-DD>/<part>.parquet
+
+Each row is the full state of an item (`DATA_COLUMNS`) when it changed, so the
+current items are the latest row of every item, and the older rows are its price history.
+
+The current items are also kept compacted in a single file (one row per item):
+    <data_dir>/<history_latest_file>
+updated on every append. It is read once per run, so looking up the scraped items
+does not read the history, which grows with every run. It is rebuilt from the
+history if it is missing or older than the history (e.g. an interrupted append).
+"""
+
+import os
+from pathlib import Path
+import time
+from typing import Iterable
+
+import pandas as pd
+
+from constants import (
+    DATA_DIR,
+    DATA_COLUMNS,
+    HISTORY_DIR_NAME,
+    HISTORY_LATEST_FILE_NAME,
+)
+
+PARTITION_COLUMNS = ["site", "run_date"]
+# columns of the current items file, indexed by item title
+_STATE_COLUMNS = [column for column in DATA_COLUMNS if column != "item_title"]
+_DTYPES = {
+    "item_title": "string",
+    "item_price": "float64",
+    "item_url": "string",
+    "added_on": "string",
+    "updated_on": "string",
+}
+
+
+class PriceHistoryStore:
+    def __init__(
+        self,
+        data_dir: str = DATA_DIR,
+        history_dir_name: str = HISTORY_DIR_NAME,
+        latest_file_name: str = HISTORY_LATEST_FILE_NAME,
+    ) -> None:
+        """
+        Args:
+            data_dir (str): Data directory (default /data)
+            history_dir_name (str): Name of the history dataset directory (default history)
+            latest_file_name (str): Name of the current items file (default history_latest.parquet)
+        """
+        full_dir_path = os.path.join(Path(__file__).parent.resolve(), data_dir)
+        self.root = os.path.join(full_dir_path, history_dir_name)
+        self.latest_path = os.path.join(full_dir_path, latest_file_name)
+        self._latest = None  # the current items, indexed by title; read once
+
+    def _current(self) -> pd.DataFrame:
+        """
+        Return the current items, indexed by title (read on the first call).
+        """
+        if self._latest is not None:
+            return self._latest
+
+        history_files = list(Path(self.root).rglob("*.parquet"))
+        if os.path.exists(self.latest_path) and all(
+            path.stat().st_mtime <= os.path.getmtime(self.latest_path)
+            for path in history_files
+        ):
+            self._latest = pd.read_parquet(self.latest_path)
+        elif history_files:
+            history = pd.read_parquet(self.root, columns=DATA_COLUMNS + ["observed_at"])
+            self._latest = (
+                history.sort_values("observed_at", kind="stable")
+                .drop_duplicates(subset="item_title", keep="last")
+                .set_index("item_title")
+                .reindex(columns=_STATE_COLUMNS)
+            )
+            self._save_latest()
+        else:
+            self._latest = (
+                pd.DataFrame(columns=DATA_COLUMNS)
+                .astype(_DTYPES)
+                .set_index("item_title")
+            )
+        return self._latest
+
+    def _save_latest(self) -> None:
+        tmp_path = f"{self.latest_path}.tmp"
+        self._latest.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, self.latest_path)  # atomic; never a partial file
+
+    def is_empty(self) -> bool:
+        """
+        Return `True` if nothing was written to the history yet.
+        """
+        return self._current().empty
+
+    def count(self) -> int:
+        """
+        Return the number of items.
+        """
+        return len(self._current())
+
+    def load(self, keys: Iterable[str] = None) -> pd.DataFrame:
+        """
+        Load the current items: the latest row of every item
+        (from the current items file, not from the history).
+
+        Args:
+            keys (iterable): titles of the items to load (default all the items).
+        Returns:
+            data (pd.DataFrame): Dataframe with the `DATA_COLUMNS` columns.
+        """
+        latest = self._current()
+        if keys is not None:
+            positions = latest.index.get_indexer(list(dict.fromkeys(keys)))
+            latest = latest.iloc[positions[positions >= 0]]
+        return latest.reset_index().reindex(columns=DATA_COLUMNS)
+
+    def append(self, items: pd.DataFrame, observed_at: float = None) -> None:
+        """
+        Append the changed items to the history.
+
+        Args:
+            items (pd.DataFrame): changed items, with the `DATA_COLUMNS` columns.
+            observed_at (float): time of the run (default now).
+        Returns:
+            None
+        """
+        if items.empty:
+            return
+
+        observed_at = observed_at or time.time()
+        rows = items.reindex(columns=DATA_COLUMNS).astype(_DTYPES)
+        rows["observed_at"] = observed_at
+        rows["site"] = (
+            rows["item_url"]
+            .str.extract(r"^(?:https?://)?(?:www\.)?([^/]+)", expand=False)
+            .fillna("unknown")
+        )
+        rows["run_date"] = time.strftime("%Y-%m-%d", time.gmtime(observed_at))
+
+        latest = self._current()  # before the append; the file is not outdated yet
+
+        rows.to_parquet(
+            self.root,
+            engine="pyarrow",
+            compression="zstd",
+            partition_cols=PARTITION_COLUMNS,
+            index=False,
+        )
+
+        # the appended rows are the new current state of their items
+        changed = (
+            rows.drop_duplicates(subset="item_title", keep="last")
+            .set_index("item_title")
+            .reindex(columns=_STATE_COLUMNS)
+        )
+        self._latest = pd.concat([latest[~latest.index.isin(changed.index)], changed])
+        self._save_latest()
+
+    def import_dataframe(self, data: pd.DataFrame) -> None:
+        """
+        Seed the history with existing items (e.g. the items of `data.csv`).
+
+        Args:
+            data (pd.DataFrame): items with the `DATA_COLUMNS` columns.
+        Returns:
+            None
+        """
+        self.append(data.drop_duplicates(subset="item_title", keep="first"))
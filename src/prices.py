@@ -0,0 +1,77 @@
+"""
+Price parsing.
+
+Turn the raw price texts of the websites ("$1,299.99", "$10.00 – $20.00", "3,25 €", ...) into floats,
+in a single pass over the text:
+    - the currency symbols and the words around the price are ignored.
+    - a range is read as its first (lowest) price.
+    - separators: when both "," and "." are used, the rightmost one is the decimal point
+        ("1,299.99" and "1.299,99"); a repeated separator is a thousands separator ("1,234,567");
+        a single "," is a thousands separator if exactly three digits follow it ("$1,234"),
+        else the decimal point ("3,25"); spaces (and non-breaking spaces) between groups of
+        three digits, before the decimal part, are thousands separators ("1 234,56").
+
+The same prices repeat on every page and every run; the parsed texts are memoized.
+"""
+
+from functools import lru_cache
+import re
+
+# maximum number of memoized price texts
+PRICE_CACHE_SIZE = 4096
+
+# the first number of the text, with its separators (a space only before a group of three digits,
+# and before the first "," or ".": "$12.99 100 sold" is 12.99)
+_NUMBER_PATTERN = re.compile(r"\d(?:\d|[ \u00a0\u202f](?=\d{3}(?!\d)))*[\d,.]*")
+_SPACE_SEPARATORS = str.maketrans("", "", " \u00a0\u202f")
+
+
+def parse_price(text: str = None, thousands_comma_separator: bool = False) -> float:
+    """
+    Extract the price of a text.
+
+    Args:
+        text (str): The text that contains the price.
+        thousands_comma_separator (bool): Whether a single comma in `text` is always a thousands separator.
+    Returns:
+        price (float): The extracted price (0.0 if the text has no price).
+    """
+    if not text:
+        return 0.0
+    # a plain string key; a `NavigableString` would keep its whole tree in the cache
+    return _parse_price(str(text), thousands_comma_separator)
+
+
+@lru_cache(maxsize=PRICE_CACHE_SIZE)
+def _parse_price(text: str, thousands_comma_separator: bool) -> float:
+    match = _NUMBER_PATTERN.search(text)
+    if match is None:
+        return 0.0
+
+    number = (
+        match.group().rstrip(",.").translate(_SPACE_SEPARATORS)
+    )  # e.g. "Price: 12."
+    if thousands_comma_separator:
+        number = number.replace(",", "")
+
+    separators = [char for char in number if char in ",."]
+    if not separators:
+        return float(number)
+
+    decimal_point = separators[-1]
+    if separators.count(decimal_point) > 1 or (
+        separators == [","] and len(number) - number.index(",") == 4
+    ):
+        # only thousands separators
+        return float(number.replace(",", "").replace(".", ""))
+
+    integer, _, fraction = number.rpartition(decimal_point)
+    integer = integer.replace(",", "").replace(".", "")
+    return float(f"{integer}.{fraction}")
+
+
+def price_cache_info():
+    """
+    Return the statistics of the memoized price texts (hits, misses, maxsize, currsize).
+    """
+    return _parse_price.cache_info()
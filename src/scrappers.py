@@ -1,44 +1,177 @@
 """
 Scrappers functions.
-Each website has a different scrapping function.
-
-# List of urls:
-# COMPLETED
-# https://plaidonline.com/products?closeout=True
-# https://www.enasco.com/c/Clearance
-# https://www.nordstromrack.com/clearance
-# https://www.altomusic.com/by-category/hot-deals/on-sale
-# https://www.muscleandstrength.com/store/category/clearance.html
-# https://camerareadycosmetics.com/collections/makeup-sale 
-# https://www.officesupply.com/clearance
-# https://www.gamestop.com/deals
-# https://www.scheels.com/c/all/sale
-# https://www.academy.com/c/shops/sale 
-# https://www.4sgm.com/category/536/Top-Deals.html?minPrice=&maxPrice=&minQty=&sort=inventory_afs&facetNameValue=Category_value_Top+Deals&size=100&page={page}
-
-
-# CHECKED - NOT WORKING ¯\_(ツ)_/¯
-# https://chesapeake.yankeecandle.com/chesapeake-bay-candle/sale/ # blocked by robots.txt, <Response [403]>
-# https://www.gamenerdz.com/sale-clearance # dynamic website - JS to load content
-# https://www.dickblick.com/products/wacky-links-sets/?fromSearch=%2Fclearance%2F # dynamic website - JS to load content
-# https://entirelypetspharmacy.com/s.html?tag=sale-specials # dynamic website - JS to load content 
-# https://www.shopatdean.com/collections/clearance-closeouts-overstock #  dynamic website - JS to load content
-
-# TODO RE-CHECK
-# WIP
+Every website runs through the same scrapping engine;
+the websites definitions (pages discovery and items extraction) are in `sites.py`.
 
+The scrapping decisions shared by the engines (threads here, asyncio in `async_scrappers.py`):
+the retries, the page size tuning and the pages discovery, are written once as steps:
+generators that yield their I/O operations (`GET`, `SLEEP`, `WAIT`) and receive the results.
+Each engine runs the steps with its own I/O (see `Scrapper._run_steps`).
 """
+
+from collections import deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from http import HTTPStatus
+import threading
 import time
 import traceback
+from typing import Deque, Dict, Generator, Iterator, List, Optional, Tuple, Union
 
-from bs4 import BeautifulSoup
 import requests
 
-from helpers import get_domain_name, extract_price, get_elapsed_time, updated_datetime
-from constants import PAGES_SLEEP_INTERVAL
+from helpers import get_domain_name, get_elapsed_time
+from constants import (
+    RATE_LIMIT_INITIAL,
+    RATE_LIMIT_MIN,
+    RATE_LIMIT_MAX,
+    RATE_LIMIT_BURST,
+    PREFETCH_PAGES,
+    FAN_OUT_PAGES,
+    PAGE_RETRIES,
+    RETRY_BACKOFF,
+    USE_CHECKPOINTS,
+)
+from crawl_progress import (
+    ErrorBudgetExceeded,
+    SiteCheckpoint,
+    SiteProgress,
+    clear_checkpoints,
+)
+from fetchers import (
+    AdaptiveRateLimiter,
+    backoff_delay,
+    fan_out,
+    merge_streams,
+    prefetch,
+)
+from http_client import HttpClient
+from page_cache import PageCache
+from page_memo import PageMemo, fingerprint
+from parsing import ParsePool
+from sites import SITES
 from telegram_bot_utils import TelegramBot
 
+# fetched pages outcomes
+NOT_MODIFIED = "not_modified"  # 304; cached items
+UNCHANGED = "unchanged"  # same items part as an already parsed page; memoized items
+PARSED = "parsed"
+RESUMED = "resumed"  # scraped by an interrupted run; checkpointed items
+PAGE_OUTCOMES = (NOT_MODIFIED, UNCHANGED, PARSED, RESUMED)
+
+# a scraped page, as yielded to the consumer; `resumed` pages were handled by an interrupted run
+ScrapedPage = namedtuple(
+    "ScrapedPage", ["site_index", "site_name", "page_url", "items", "resumed"]
+)
+
+# responses worth retrying
+RETRY_STATUSES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+# I/O operations of the scrapping steps: (operation, argument) -> result
+GET = "get"  # (url, conditional) -> the response, or the request error
+SLEEP = "sleep"  # seconds -> None
+WAIT = "wait"  # concurrent future -> its result (its error is raised in the steps)
+
+Steps = Generator[Tuple[str, object], object, object]
+
+
+def check_response(res) -> None:
+    """
+    Raise the fetch error of a page, or an `AssertionError` if it is not a 200 response.
+    """
+    if isinstance(res, Exception):
+        raise res
+    assert res.status_code == HTTPStatus.OK, f"status code {res.status_code}"
+
+
+def in_sites_order(values: Iterator[Union[ScrapedPage, int]]) -> Iterator[ScrapedPage]:
+    """
+    Yield the pages of interleaved websites in the websites order (the order of a sequential run):
+    the pages of a website as soon as the earlier websites are finished; until then they are held.
+
+    Args:
+        values (iterator): the pages, in pages order per website, and the index of every finished website.
+    Return:
+        pages (iterator): the pages, in websites order.
+    """
+    held = dict()  # site_index: pages of a later website
+    finished = set()
+    current = 0  # the website whose pages are yielded right away
+    for value in values:
+        if isinstance(value, int):
+            finished.add(value)
+        elif value.site_index == current:
+            yield value
+        else:
+            held.setdefault(value.site_index, list()).append(value)
+        while current in finished:
+            current += 1
+            yield from held.pop(current, ())
+
+
+def _done_future(result) -> Future:
+    """
+    Return a future that is already resolved to `result`.
+    """
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def should_retry(res) -> bool:
+    """
+    Return `True` if a fetch is worth retrying: a request error or a retryable status code.
+    """
+    return isinstance(res, Exception) or res.status_code in RETRY_STATUSES
+
+
+class SitePages:
+    def __init__(self, base_url: str) -> None:
+        """
+        Where the items of every page of a website come from: the pages scraped by an
+        interrupted run and the first page at the tuned page size are ready (futures of
+        their items), the first page response is reused, the other pages are fetched.
+
+        Args:
+            base_url (str): first page of the website.
+        """
+        self.base_url = base_url
+        self.ready = dict()  # page_url: future of the items
+        self.first_page = None  # response of the base url, until it is taken
+
+    def to_fetch(self, page_urls: List[str]) -> List[str]:
+        """
+        Return the urls of the pages to fetch, in pages order.
+        """
+        return [page_url for page_url in page_urls if not self._is_known(page_url)]
+
+    def take(self, page_url: str) -> Tuple[Optional[Future], Optional[object]]:
+        """
+        Take the items or the response of a page, if it is ready or is the first page.
+
+        Return:
+            page (tuple): (future of the items, None) of a ready page, (None, response)
+                of the first page, or (None, None) of a page to fetch.
+        """
+        if page_url in self.ready:
+            return self.ready.pop(page_url), None
+        if self.first_page is not None and page_url == self.base_url:
+            res, self.first_page = self.first_page, None
+            return None, res
+        return None, None
+
+    def _is_known(self, page_url: str) -> bool:
+        return page_url in self.ready or (
+            self.first_page is not None and page_url == self.base_url
+        )
+
 
 class Scrapper:
     def __init__(self) -> None:
@@ -47,1075 +180,587 @@ class Scrapper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36",
         }
         self.telegram_bot = TelegramBot()
+        # pooled keep-alive connections, shared by all the websites
+        self.http_client = HttpClient(headers=self.headers)
+        # pages are parsed in worker processes, while the threads keep fetching
+        self.parse_pool = ParsePool()
+        # validators and items of the fetched pages, for conditional requests
+        self.page_cache = PageCache()
+        # items of the already parsed pages, by page fingerprint
+        self.page_memo = PageMemo()
+        self._page_stats = dict()  # site_name: {outcome: number of pages}
+        self._progress = dict()  # site_name: SiteProgress
         # self.items = list() # free memory each call
         self.num_of_websites = 0
+        self._lock = threading.Lock()
+        # shared between the websites; each host has its own adaptive rate
+        self.throttle = AdaptiveRateLimiter(
+            rate=RATE_LIMIT_INITIAL,
+            min_rate=RATE_LIMIT_MIN,
+            max_rate=RATE_LIMIT_MAX,
+            burst=RATE_LIMIT_BURST,
+        )
 
-    def scrape_plaidonline(self):
+    def _get(self, url: str, conditional: bool = False) -> requests.Response:
         """
-        Scrapper for: "https://plaidonline.com/"
+        Send a GET request, within the rate limit of the host; the response adapts the rate.
 
         Args:
-            _
+            url (str): url to request.
+            conditional (bool): send the validators of the cached page, if any (default False).
         Return:
-            items (list): list of scrapped items.
+            res (requests.Response): the response.
         """
-        domain_name = "https://plaidonline.com/"
-        base_url = "https://plaidonline.com/products?closeout=True"
-
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
+        headers = self.page_cache.conditional_headers(url) if conditional else None
+        self.throttle.wait(url)
 
+        start_time = time.monotonic()
         try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get number of pages
-            # it is 5 pages, but I don't want to hard code it incase it increases
-            try:
-                raw_pages_data = soup.find(class_="PagerNumberArea").find_all("span")[3]
-                no_of_pages = []
-                selected_page = raw_pages_data.find(class_="SelectedPage").string
-                no_of_pages.append(selected_page)
-                unselected_pages = raw_pages_data.find_all(class_="UnselectedPage")
-                for unselected_page in unselected_pages:
-                    no_of_pages.append(unselected_page.string)
-
-                no_of_pages = sorted(map(int, no_of_pages))
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 5
-            # scrape pages
-            for page_no in no_of_pages:
-                page_url = base_url + f"&page={page_no}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                # find all class="price" but skip the second one (each item has 2 "price" classes)
-                prices = [
-                    _ if i % 2 == 0 else None
-                    for i, _ in enumerate(soup.find_all(class_="price"))
-                ]
-                # remove None
-                prices_clean = [price for price in prices if price]
-                # len(prices_clean) # 40 for full items in a page
-                for raw_item_price in prices_clean:
-                    # item_price
-                    item_price = extract_price(raw_item_price.text)
-                    # item_title
-                    item_title = raw_item_price.parent.h3.text
-                    # item_url
-                    item_url = raw_item_price.parent.parent.parent.parent.find("a").get(
-                        "href"
-                    )
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
-
-                time.sleep(PAGES_SLEEP_INTERVAL)
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
-            )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
+            res = self.http_client.get(url, headers=headers)
+        except requests.exceptions.RequestException:
+            self.throttle.record(url, None, time.monotonic() - start_time)
+            raise
+        self.throttle.record(
+            url,
+            res.status_code,
+            time.monotonic() - start_time,
+            res.headers.get("Retry-After"),
         )
+        return res
 
-        return items
-
-    def scrape_enasco(self):
+    def _run_steps(self, steps: Steps):
         """
-        Scrapper for: "https://www.enasco.com/"
+        Run scrapping steps in the calling thread: perform their I/O operations.
+
         Args:
-            _
+            steps (generator): the steps, yielding (operation, argument) and receiving the results.
         Return:
-            items (list): list of scrapped items.
+            result: the steps result.
         """
-        domain_name = "https://www.enasco.com/"
-        base_url = "https://www.enasco.com/c/Clearance"
-
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
-
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
+        result, error = None, None
+        while True:
             try:
-                raw_pages_data = soup.find(class_="pagination-data_view").text
-                # 'Page\n\t\t\t\t1 of 62' > get the max number after 'of'
-                no_of_pages = int(raw_pages_data[raw_pages_data.find("of") + 2 :])
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 62
-
-            # scrape pages
-            for page_no in range(no_of_pages):
-                page_url = (
-                    base_url
-                    + f"?page={page_no}&gridstyle=gridStyle&text=&q=%3Arelevance"
-                )
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(
-                    class_="similar-products__item col-xs-12 col-sm-6 col-md-4 slp-eq-height"
+                operation, argument = (
+                    steps.send(result) if error is None else steps.throw(error)
                 )
-                for product in products:
-                    product_data = product.find(
-                        class_="row-eq-height ea-product-cell-name"
-                    )
-                    # item_title
-                    item_title = product_data.a.string
-                    # item_url
-                    item_url = product_data.a.get("href")
-                    # item_price
-                    try:
-                        # try to get after price - if exists
-                        item_price = extract_price(
-                            product.find(class_="ea-product-cell-price").string
-                        )
-                    except AttributeError:  # only old price
-                        item_price = extract_price(
-                            product.find(
-                                class_="similar-products__data_old-price"
-                            ).string
-                        )
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
-
-                time.sleep(PAGES_SLEEP_INTERVAL)
-
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
-            )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
-        )
-
-        return items
-
-    def scrape_nordstromrack(self):
+            except StopIteration as stop:
+                return stop.value
+
+            result, error = None, None
+            if operation == GET:
+                try:
+                    result = self._get(*argument)
+                except requests.exceptions.RequestException as e:
+                    result = e
+            elif operation == SLEEP:
+                time.sleep(argument)
+            else:  # WAIT
+                try:
+                    result = argument.result()
+                except Exception as e:
+                    error = e
+
+    def _fetch_page_steps(self, url: str, conditional: bool = False) -> Steps:
         """
-        Scrapper for: "https://www.nordstromrack.com/"
+        Fetch a page; retry connection errors and retryable status codes with jittered exponential backoff.
 
         Args:
-            _
+            url (str): url to request.
+            conditional (bool): send the validators of the cached page, if any (default False).
         Return:
-            items (list): list of scrapped items.
+            res (response|Exception): the last response, or the last error if there was no response.
+        """
+        for attempt in range(PAGE_RETRIES + 1):
+            if attempt:
+                yield SLEEP, backoff_delay(attempt, RETRY_BACKOFF)
+            res = yield GET, (url, conditional)
+            if not should_retry(res):
+                break
+        return res
+
+    def _fetch_page(
+        self, url: str, conditional: bool = False
+    ) -> Union[requests.Response, Exception]:
+        """
+        Fetch a page, with retries (see `_fetch_page_steps`).
         """
-        domain_name = "https://www.nordstromrack.com/"
-        base_url = "https://www.nordstromrack.com/clearance"
+        return self._run_steps(self._fetch_page_steps(url, conditional))
 
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
+    def _fetch_pages(
+        self, page_urls: List[str], all_at_once: bool = False
+    ) -> Iterator[Union[requests.Response, Exception]]:
+        """
+        Fetch the pages of a website (conditional requests), downloading the
+        upcoming pages while the current one is parsed.
 
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
+        Args:
+            page_urls (list): urls of the pages to fetch.
+            all_at_once (bool): request the pages `FAN_OUT_PAGES` at a time, up to twice as many
+                pages ahead of the parsing (default `PREFETCH_PAGES` pages ahead of the parsing).
+        Return:
+            responses (iterator): pages responses (or errors), in the same order as `page_urls`.
+        """
+        fetch = partial(self._fetch_page, conditional=True)
+        if all_at_once:
+            return fan_out(fetch, page_urls, max_workers=FAN_OUT_PAGES)
+        return prefetch(fetch, page_urls, lookahead=PREFETCH_PAGES)
 
-            soup = BeautifulSoup(res.content, "html.parser")
+    def _tune_page_size_steps(self, site_name: str) -> Steps:
+        """
+        Find the largest page size a website paginated by offsets honours, among its
+        `larger_page_sizes`: request the first page at every size, while the page is full.
 
-            # get num_of_pages
+        Args:
+            site_name (str): name of the website.
+        Return:
+            page_size (int): the largest honoured page size (`None` for the website page size).
+            pages (dict): page_url: future of the items, of the first page at that size.
+        """
+        site = SITES[site_name]
+        pagination = site["pagination"]
+        page_size, pages = None, dict()
+        for size in getattr(pagination, "larger_page_sizes", ()):
+            page_url = pagination.page_url(site["base_url"], 0, size)
             try:
-                num_of_items = int(soup.find(class_="jHG4O").text.strip(" items"))
-                item_per_page = 72
-                no_of_pages = round(num_of_items / item_per_page)
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 140  # ~
-
-            # scrape pages
-            for page_no in range(1, no_of_pages + 1):
-                page_url = base_url + f"?page={page_no}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(class_="ivm_G _PT1R")
-
-                for product in products:
-                    product_data = product.find(class_="kKGYj TpwNx")
-                    # item_title
-                    item_title = product_data.a.string
-                    # item_url
-                    item_url = product_data.a.get("href")
-                    # item_price
-                    try:
-                        # get the lowest price
-                        item_price = extract_price(
-                            product.select("span.qHz0a.BkySr.EhCiu.t1yis.sxEtG.jRV6p")[
-                                0
-                            ].string.split("–")[0]
-                        )
-                    except IndexError:
-                        try:
-                            item_price = extract_price(
-                                product.select("span.qHz0a.EhCiu.t1yis.sxEtG.jRV6p")[
-                                    0
-                                ].string
-                            )
-                        except (IndexError, Exception) as e:
-                            item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
+                res = yield from self._fetch_page_steps(page_url)
+                parsed_page = self._parse_page(site_name, page_url, res)
+                num_of_items = len((yield WAIT, parsed_page))
+            except Exception:
+                break
+            if not pagination.is_full(size, num_of_items):
+                break
+            page_size, pages = size, {page_url: parsed_page}
+        return page_size, pages
+
+    def _discover_steps(
+        self, site_name: str, progress: SiteProgress, pages: SitePages
+    ) -> Steps:
+        """
+        Resume the interrupted crawl of a website, or fetch its first page, tune its
+        page size and discover its pages urls (set on `progress`).
 
-                time.sleep(PAGES_SLEEP_INTERVAL)
+        Args:
+            site_name (str): name of the website.
+            progress (SiteProgress): progress of the website.
+            pages (SitePages): the pages of the website; the ready pages and the first page are set.
+        """
+        # pages scraped by an interrupted run
+        resumed_pages = self._resume_site(progress)
+        pages.ready = {
+            page_url: _done_future(items) for page_url, items in resumed_pages.items()
+        }
+        if resumed_pages:
+            return
 
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
-            )
-            self.telegram_bot.send_error(error_message)
+        pages.first_page = yield from self._fetch_page_steps(pages.base_url)
+        check_response(pages.first_page)
 
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
+        # the first page at the largest page size the website honours, if it has page sizes
+        page_size, pages.ready = yield from self._tune_page_size_steps(site_name)
+        page_urls = yield WAIT, self.parse_pool.submit_page_urls(
+            site_name, pages.first_page.content, page_size
         )
+        # the pages are matched to their responses by url; a page is scraped once
+        progress.set_page_urls(list(dict.fromkeys(page_urls)))
 
-        return items
-
-    def scrape_altomusic(self):
+    def _parse_page(self, site_name: str, page_url: str, res) -> Future:
         """
-        Scrapper for: "https://www.altomusic.com/"
+        Extract the items of a fetched page in the parse pool, and cache them.
+        A not modified page reuses its cached items, and a page with the same
+        items part as an already parsed page reuses its memoized items.
 
         Args:
-            _
+            site_name (str): name of the website.
+            page_url (str): requested url of the page.
+            res: the page response (or fetch error).
         Return:
-            items (list): list of scrapped items.
+            future (Future): future of the page's items.
         """
-        domain_name = "https://www.altomusic.com/"
-        base_url = "https://www.altomusic.com/by-category/hot-deals/on-sale"
-
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
-
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
-            try:
-                raw_pages_data = soup.find_all(attrs={"class": "toolbar-number"})
-                items_per_page = total_items = int(raw_pages_data[1].string)
-                total_items = int(raw_pages_data[-1].string)
-                no_of_pages = round(total_items / items_per_page)
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 23  # ~
-
-            # scrape pages
-            for page_no in range(1, no_of_pages + 1):
-                page_url = base_url + f"?p={page_no}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(attrs={"class": "details"})
-
-                for product in products:
-                    product_data = product.find(class_="product-item-link")
-                    # item_title
-                    item_title = product_data.string.strip()
-                    # # item_url
-                    item_url = product_data.get("href")
-                    # item_price
-                    try:
-                        # combine price with decimal
-                        init_price = product.find(class_="price").string
-                        dec_price = product.find(class_="decimal")
-                        if dec_price:
-                            init_price += dec_price.string
-                        item_price = extract_price(init_price)
-                    except Exception:
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": item_url if item_url else domain_name,
-                        }
-                    )
-
-                time.sleep(PAGES_SLEEP_INTERVAL)
+        if getattr(res, "status_code", None) == HTTPStatus.NOT_MODIFIED:
+            items = self.page_cache.get_items(page_url)
+            assert items is not None, f"Not modified page is not cached: {page_url}"
+            self._count_page(site_name, NOT_MODIFIED)
+            return _done_future(items)
+
+        check_response(res)
+        page_fingerprint = fingerprint(site_name, res.content)
+        items = self.page_memo.get(page_fingerprint)
+        if items is not None:
+            self._count_page(site_name, UNCHANGED)
+            self.page_cache.put(page_url, res.headers, items)
+            return _done_future(items)
+
+        self._count_page(site_name, PARSED)
+        parsed_page = self.parse_pool.submit_items(site_name, res.content)
+
+        def store_items(parsed_page):
+            if not parsed_page.cancelled() and parsed_page.exception() is None:
+                self.page_memo.put(page_fingerprint, parsed_page.result())
+                self.page_cache.put(page_url, res.headers, parsed_page.result())
+
+        parsed_page.add_done_callback(store_items)
+        return parsed_page
+
+    def _count_page(self, site_name: str, outcome: str) -> None:
+        """
+        Count a fetched page of a website (thread safe).
 
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
+        Args:
+            site_name (str): name of the website.
+            outcome (str): one of `PAGE_OUTCOMES`.
+        """
+        with self._lock:
+            site_stats = self._page_stats.setdefault(
+                site_name, dict.fromkeys(PAGE_OUTCOMES, 0)
             )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
-        )
+            site_stats[outcome] += 1
 
-        return items
+    def _count_website(self) -> None:
+        """
+        Increase the number of scrapped websites (thread safe).
+        """
+        with self._lock:
+            self.num_of_websites += 1
 
-    def scrape_muscleandstrength(self):
+    def scrape_websites(self, site_names: List[str], max_workers: int = 1) -> List:
         """
-        Scrapper for: "https://www.muscleandstrength.com/"
+        Run the websites scrappers and merge their items.
+
+        Each website runs in its own worker, at most `max_workers` websites at a time.
+        The merged items are in the same order as a sequential run.
 
         Args:
-            _
+            site_names (list): names of the websites to scrape (keys of `sites.SITES`).
+            max_workers (int): Maximum number of websites to scrape at the same time (default 1; sequential).
         Return:
-            items (list): list of scrapped items.
+            items (list): list of scrapped items of all websites.
         """
-        domain_name = "https://www.muscleandstrength.com/"
-        base_url = "https://www.muscleandstrength.com/store/category/clearance.html"
-
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
         items = list()
 
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
-            try:
-                displayed_items = int(
-                    soup.find(class_="search-result-displayed-count").string
-                )  # useless
-                available_items = int(
-                    soup.find(class_="search-result-available-count").string
-                )
-                item_added_per_page = 20  # tested
-                no_of_pages = round(available_items / item_added_per_page)
-                no_of_pages
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 9  # ~
-
-            # scrape pages
-            for page_no in range(1, no_of_pages + 1):
-                page_url = base_url + f"?p={page_no}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
+        if max_workers <= 1:
+            for site_name in site_names:
+                items.extend(self.scrape_site(site_name))
+            return items
 
-                soup = BeautifulSoup(res.content, "html.parser")
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="scrapper"
+        ) as executor:
+            # `map` keeps the order of the websites
+            for website_items in executor.map(self.scrape_site, site_names):
+                items.extend(website_items)
 
-                products = soup.find_all(
-                    class_="cell small-12 bp600-6 bp960-4 large-3 grid-product"
-                )
+        return items
 
-                for product in products:
-                    product_data = product.find(class_="product-name")
-                    # item_title
-                    item_title = product_data.string.strip()
-                    # # item_url
-                    item_url = product_data.get("href")
-                    # item_price
-                    try:
-                        item_price = extract_price(product.find(class_="price").string)
-                    except Exception:
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
+    def iter_websites(
+        self, site_names: List[str], max_workers: int = 1
+    ) -> Iterator[ScrapedPage]:
+        """
+        Run the websites scrappers and yield their pages, as soon as each page is parsed.
+        Call `checkpoint_page` once the items of a page are handled.
 
-                time.sleep(PAGES_SLEEP_INTERVAL)
+        Each website runs in its own worker, at most `max_workers` websites at a time.
+        The pages are yielded in the order of a sequential run: the pages of a website
+        as soon as the earlier websites are finished (see `in_sites_order`); the later
+        websites keep being scraped meanwhile.
 
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
+        Args:
+            site_names (list): names of the websites to scrape (keys of `sites.SITES`).
+            max_workers (int): Maximum number of websites to scrape at the same time (default 1; sequential).
+        Return:
+            pages (iterator): every scrapped page.
+        """
+        if max_workers <= 1:
+            for site_index, site_name in enumerate(site_names):
+                yield from self.iter_site(site_name, site_index)
+            return
+
+        def iter_indexed_site(site):
+            site_index, site_name = site
+            yield from self.iter_site(site_name, site_index)
+            yield site_index  # the website is finished
+
+        yield from in_sites_order(
+            merge_streams(
+                iter_indexed_site,
+                enumerate(site_names),
+                max_workers=max_workers,
+                maxsize=max_workers * max(PREFETCH_PAGES, 1),
             )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
         )
 
-        return items
-
-    def scrape_camerareadycosmetics(self):
+    def http_stats(self) -> Dict[str, int]:
         """
-        Scrapper for: "https://camerareadycosmetics.com/"
-
-        Args:
-            _
-        Return:
-            items (list): list of scrapped items.
+        Return the HTTP connections reuse statistics.
         """
-        domain_name = "https://camerareadycosmetics.com/"
-        base_url = "https://camerareadycosmetics.com/collections/makeup-sale"
+        return self.http_client.stats()
 
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
+    def page_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return the number of not modified, unchanged, parsed and resumed pages per website.
+        """
+        with self._lock:
+            return {
+                site_name: dict(site_stats)
+                for site_name, site_stats in self._page_stats.items()
+            }
 
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
+    def rate_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the requests rate and throttle events per host.
+        """
+        return self.throttle.stats()
 
-            soup = BeautifulSoup(res.content, "html.parser")
+    def missing_pages(self) -> Dict[str, Dict[str, str]]:
+        """
+        Return the pages that were not scraped, per website.
 
-            # get num_of_pages
-            try:
-                raw_pages_data = soup.find_all(class_="page")
-                no_of_pages = int(raw_pages_data[-1].a.string)
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 2  # ~
-
-            # scrape pages
-            for page_no in range(1, no_of_pages + 1):
-                page_url = base_url + f"?page={page_no}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(attrs={"class": "grid-item"})
-
-                for product in products:
-                    product_data = product.find(class_="grid-product__title")
-                    # item_title
-                    item_title = product_data.a.string.strip()
-                    # # item_url
-                    item_url = product_data.a.get("href")
-                    # item_price
-                    try:
-
-                        item_price = extract_price(
-                            product.find(
-                                attrs={"class": "grid-product__price--current"}
-                            )
-                            .find("span", class_="money")
-                            .string
-                        )
-                    except Exception:
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
+        Return:
+            missing (dict): site_name: {page_url: reason}, only the websites with missing pages.
+        """
+        with self._lock:
+            progresses = list(self._progress.values())
+        missing = dict()
+        for progress in progresses:
+            site_missing = progress.missing_pages()
+            if site_missing:
+                missing[progress.site_name] = site_missing
+        return missing
+
+    def _site_progress(self, site_name: str) -> SiteProgress:
+        """
+        Start tracking (and checkpointing) the progress of a website (thread safe).
+        """
+        checkpoint = SiteCheckpoint(site_name) if USE_CHECKPOINTS else None
+        progress = SiteProgress(
+            site_name, SITES[site_name]["base_url"], checkpoint=checkpoint
+        )
+        with self._lock:
+            self._progress[site_name] = progress
+        return progress
 
-                time.sleep(PAGES_SLEEP_INTERVAL)
+    def _resume_site(self, progress: SiteProgress) -> Dict[str, List[Dict]]:
+        """
+        Resume the interrupted crawl of a website, if any.
 
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
+        Return:
+            pages (dict): page_url: items, of the pages scraped by the interrupted crawl.
+        """
+        resumed_pages = progress.resume()
+        for _ in resumed_pages:
+            self._count_page(progress.site_name, RESUMED)
+        if resumed_pages:
+            self.telegram_bot.send_alert(
+                f"Resuming {progress.site_name}: {len(resumed_pages)}/{len(progress.page_urls)} pages already scraped."
             )
-            self.telegram_bot.send_error(error_message)
+        return resumed_pages
 
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
-        )
+    def clear_checkpoints(self) -> None:
+        """
+        Remove the crawl checkpoints; call it once the scraped items are saved.
+        """
+        clear_checkpoints()
 
-        return items
+    def close(self) -> None:
+        """
+        Release the network and parsing resources.
+        """
+        self.http_client.close()
+        self.parse_pool.shutdown()
+        self.page_memo.close()
 
-    def scrape_officesupply(self):
+    def scrape_site(self, site_name: str) -> List[Dict]:
         """
-        Scrapper for: "https://www.officesupply.com/"
+        Scrape a website defined in `sites.SITES`.
 
         Args:
-            _
+            site_name (str): name of the website, e.g. "enasco".
         Return:
             items (list): list of scrapped items.
         """
-        domain_name = "https://www.officesupply.com/"
-        base_url = "https://www.officesupply.com/clearance"
-
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
         items = list()
-
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
-            # try:
-            #     raw_pages_data = soup.find_all(class_="page")
-            #     no_of_pages = int(raw_pages_data[-1].a.string)
-            # except Exception as e:
-            #     print("Error getting pages", e)
-            no_of_pages = 1
-
-            # scrape pages
-            for page_no in range(1, no_of_pages + 1):
-                # page_url = base_url + f"?page={page_no}"
-                # res = requests.request("GET", url=page_url, headers=self.headers)
-                # assert res.status_code == HTTPStatus.OK
-
-                # soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(class_="product-details")
-
-                for product in products:
-                    product_data = product.find(class_="title")
-                    # item_title
-                    item_title = product_data.span.string
-                    # # item_url
-                    item_url = product_data.a.get("href")
-                    # item_price
-                    try:
-                        item_price = extract_price(
-                            product.parent.find(class_="price")
-                            .find("span")
-                            .string.strip()
-                        )
-                    except Exception as e:
-                        traceback.format_exc()
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
-
-                # time.sleep(PAGES_SLEEP_INTERVAL)
-
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
-            )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
-        )
-
+        for page in self.iter_site(site_name):
+            items.extend(page.items)
+            self.checkpoint_page(page)
         return items
 
-    def scrape_gamestop(self):
+    def iter_site(self, site_name: str, site_index: int = 0) -> Iterator[ScrapedPage]:
         """
-        Scrapper for: "https://www.gamestop.com/"
+        Scrape a website defined in `sites.SITES`, page by page.
 
         Args:
-            _
+            site_name (str): name of the website, e.g. "enasco".
+            site_index (int): index of the website in the run (default 0).
         Return:
-            items (list): list of scrapped items.
+            pages (iterator): every scrapped page, in pages order.
         """
-        domain_name = "https://www.gamestop.com/"
-        base_url = "https://www.gamestop.com/deals"
+        progress = self._site_progress(site_name)
+        base_url = progress.base_url
+
+        local_now = self._start_site(base_url)
+        num_of_items = 0
+        for page_url, items in self._iter_site_pages(site_name, progress):
+            num_of_items += len(items)
+            yield self._scraped_page(progress, site_index, page_url, items)
+        self._report_finish(base_url, local_now, num_of_items)
+
+    def _scraped_page(
+        self, progress: SiteProgress, site_index: int, page_url: str, items: List[Dict]
+    ) -> ScrapedPage:
+        return ScrapedPage(
+            site_index,
+            progress.site_name,
+            page_url,
+            items,
+            page_url in progress.resumed,
+        )
 
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
+    def checkpoint_page(self, page: ScrapedPage) -> None:
+        """
+        Checkpoint a page once its items are handled (reconciled and reported);
+        an interrupted run resumes after it.
+        """
+        with self._lock:
+            progress = self._progress[page.site_name]
+        progress.page_reported(page.page_url, page.items)
+
+    def _iter_site_pages(
+        self, site_name: str, progress: SiteProgress
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        base_url = progress.base_url
+        pages = SitePages(base_url)
+        parsed_pages = deque()  # (page_url, future of the page's items)
+        res = None
 
         try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
-            try:
-                # raw_pages_data = soup.find_all(class_="pagination-numbering")
-                # no_of_pages = int(raw_pages_data[-1].a.string)
-
-                products_count = soup.find("span", class_="pageResults")
-                products_count = int(
-                    extract_price(products_count.string, thousands_comma_separator=True)
-                )
-            except Exception as e:
-                print("Error getting pages", e)
-                products_count = 12412  # ~
-
-            # scrape pages
-            # item_per_page: increase by multiples of 24 to increase speed.
-            # NOTE the request will take more time.
-            item_per_page = 24 * 4
-            # i = 0 # DEBUG
-            for product_idx in range(0, products_count + 1, item_per_page):
-                # if i > 2:
-                #     break # DEBUG: 3 iterations
-                # i += 1
-                # if product_idx % item_per_page == 0:
-                #     print(product_idx)  # DEBUG: check if the script is stuck
-                page_url = base_url + f"?start={product_idx}&sz={item_per_page}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products_raw = soup.find(class_="product-grid-wrapper")
-                products = products_raw.find_all(class_="product grid-tile")
-
-                for product in products:
-                    product_data = product.find(class_="tile-body")
-                    # item_title
-                    item_title = product_data.find(class_="link-name").p.string
-                    # # item_url
-                    item_url = product_data.find(class_="link-name").get("href")
-                    # item_price
-                    try:
-                        item_price = extract_price(
-                            product.find(class_="actual-price").string.strip()
-                        )
-                    except Exception as e:
-                        traceback.format_exc()
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
+            self._run_steps(self._discover_steps(site_name, progress, pages))
+
+            # scrape pages; fetch here, parse in the parse pool
+            # the first page is already fetched; its items are extracted from the same response
+            page_urls = progress.page_urls
+            responses = self._fetch_pages(
+                pages.to_fetch(page_urls),
+                all_at_once=SITES[site_name].get("fan_out", False),
+            )
+            for page_url in page_urls:
+                parsed_page, res = pages.take(page_url)
+                if parsed_page is not None:
+                    parsed_pages.append((page_url, parsed_page))
+                    yield from self._pop_parsed_pages(
+                        progress, parsed_pages, wait=False
                     )
-
-                time.sleep(PAGES_SLEEP_INTERVAL)
-
+                    continue
+
+                if res is None:
+                    res = next(responses)
+                try:
+                    parsed_page = self._parse_page(site_name, page_url, res)
+                except Exception as e:
+                    # skip the page
+                    progress.page_failed(page_url, e)
+                else:
+                    parsed_pages.append((page_url, parsed_page))
+
+                # hand over the pages parsed so far
+                yield from self._pop_parsed_pages(progress, parsed_pages, wait=False)
+
+            yield from self._pop_parsed_pages(progress, parsed_pages)
         except (
             AssertionError,
             requests.exceptions.HTTPError,
             requests.exceptions.ConnectionError,
             Exception,  # un-captured exception
         ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
+            progress.abort(e)
+            self._report_error(
+                base_url, e, res if res is not None else pages.first_page
             )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
-        )
-
-        return items
 
-    def scrape_scheels(self):
+            # the pages fetched before the error
+            try:
+                yield from self._pop_parsed_pages(progress, parsed_pages)
+            except Exception as e:
+                self._report_error(base_url, e)
+
+    def _pop_parsed_pages(
+        self,
+        progress: SiteProgress,
+        parsed_pages: Deque[Tuple[str, Future]],
+        wait: bool = True,
+    ) -> Iterator[Tuple[str, List[Dict]]]:
         """
-        Scrapper for: "https://www.scheels.com/"
+        Yield the items of the parsed pages, in pages order; skip the pages that failed to parse.
+        If the website runs out of error budget, drop the next pages and raise.
 
         Args:
-            _
+            progress (SiteProgress): progress of the website.
+            parsed_pages (deque): (page url, future of the page's items); the yielded pages are removed.
+            wait (bool): wait for all the pages (default), or stop at the first page that is not parsed yet.
         Return:
-            items (list): list of scrapped items.
+            pages (iterator): (page url, items) of every parsed page.
         """
-        domain_name = "https://www.scheels.com/"
-        base_url = "https://www.scheels.com/c/all/sale"
-
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
-
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
+        while parsed_pages and (wait or parsed_pages[0][1].done()):
+            page_url, parsed_page = parsed_pages.popleft()
             try:
-                no_of_pages = int(extract_price(soup.find(class_="page-last").text))
+                items = parsed_page.result()
             except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 265
-
-            # scrape pages
-            # item_per_page: increase by multiples of 24 - 1 (one ad) to increase speed.
-            # NOTE the request will take more time.
-            item_per_page = 47  # Optimum number of items per page
-            # i = 0 # DEBUG
-            for product_idx in range(0, item_per_page * no_of_pages, item_per_page):
-                # if i > 2:
-                #     break # DEBUG: 3 iterations
-                # i += 1
-                # if product_idx % item_per_page == 0:
-                #   print(product_idx)  # DEBUG: check if the script is stuck
-                page_url = base_url + f"?start={product_idx}&sz={item_per_page}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(class_="tile-inner")
-
-                for product in products:
-                    product_data = product.find(class_="name-link")
-                    # item_title
-                    item_title = product_data.string.strip()
-                    # item_url
-                    item_url = product_data.get("href")
-                    # item_price
-                    try:
-                        item_price = extract_price(
-                            product.find(attrs={"itemprop": "price"}).string.strip(),
-                            thousands_comma_separator=True,
-                        )
-                    except Exception as e:
-                        traceback.format_exc()
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
-
-                time.sleep(PAGES_SLEEP_INTERVAL)
-
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
-            )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
-        )
-
-        return items
-
-    def scrape_academy(self):
+                try:
+                    progress.page_failed(page_url, e)
+                except ErrorBudgetExceeded:
+                    for _, parsed_page in parsed_pages:
+                        parsed_page.cancel()
+                    parsed_pages.clear()
+                    raise
+                continue
+
+            progress.page_done(page_url, items)
+            yield page_url, items
+
+    def _start_site(self, base_url: str) -> float:
         """
-        Scrapper for: "https://www.academy.com/"
+        Report the start of a website scrapping.
 
         Args:
-            _
+            base_url (str): first page of the website.
         Return:
-            items (list): list of scrapped items.
+            start_time (float): start time.
         """
-        domain_name = "https://www.academy.com/"
-        base_url = "https://www.academy.com/c/shops/sale"
-
         self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
-
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
-            try:
-                no_of_pages_raw = soup.find(
-                    attrs={"data-auid": "NumberRangeNavigation"}
-                ).find_all("a")
-                no_of_pages = int(extract_price(no_of_pages_raw[-1].text))
-
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 52  # ~
-
-            # scrape pages
-            for page_no in range(1, no_of_pages):  # no_of_pages -1
-                page_url = base_url + f"?&page_{page_no}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(class_="css-18cbcd1")
-
-                for product in products:
-                    product_data = product.find(
-                        class_="product-card-simple-title css-dfh7vc"
-                    )
-                    # item_title
-                    item_title = product_data.string.strip()
-                    # # item_url
-                    item_url = product_data.get("href")
-                    # item_price
-                    try:
-                        price_data = product.find(class_="product-price").find("span")
-                        # combine price with decimal
-                        init_price = price_data.find("span").string
-                        dec_price = price_data.find_all("sup")[-1]
-                        if dec_price and int(dec_price.string):
-                            init_price += f".{dec_price.string}"
-                        item_price = extract_price(init_price)
-                    except Exception:
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
-
-                time.sleep(PAGES_SLEEP_INTERVAL)
-
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
-            )
-            self.telegram_bot.send_error(error_message)
-
-        # report to telegram
-        self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
-        )
-
-        return items
+        self._count_website()
+        return time.time()
 
-    def scrape_4sgm(self):
+    def _report_error(self, base_url: str, e: Exception, res=None) -> None:
         """
-        Scrapper for: "https://www.4sgm.com/"
+        Report an error while scrapping a website.
 
         Args:
-            _
+            base_url (str): first page of the website.
+            e (Exception): the raised exception.
+            res: the last received response (if any).
         Return:
-            items (list): list of scrapped items.
+            None
         """
-        domain_name = "https://www.4sgm.com/"
-        base_url = (
-            "https://www.4sgm.com/category/536/Top-Deals.html"
-            "?minPrice=&maxPrice=&minQty=&sort=inventory_afs&facetNameValue=Category_value_Top+Deals&size=100"
+        error_message = (
+            f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
+            f"""StatusCode: {getattr(res, "status_code", None)}. \n"""
+            f"""Traceback: {traceback.format_exc()}."""
         )
+        self.telegram_bot.send_error(error_message)
 
-        self.telegram_bot.send_alert(f"Scrapping: {get_domain_name(base_url)}")
-        self.num_of_websites += 1
-        local_now = time.time()
-        items = list()
-
-        try:
-            res = requests.request("GET", url=base_url, headers=self.headers)
-            assert res.status_code == HTTPStatus.OK
-
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            # get num_of_pages
-            try:
-                no_of_pages_raw = (
-                    soup.find(class_="pageNumber")
-                    .find_all(attrs={"class": "control-label"})[-1]
-                    .string
-                )
-                no_of_pages = int(extract_price(no_of_pages_raw))
-                no_of_pages
-
-            except Exception as e:
-                print("Error getting pages", e)
-                no_of_pages = 53  # ~
-
-            # scrape pages
-            for page_no in range(1, no_of_pages + 1):  # no_of_pages -1
-                page_url = base_url + f"&page={page_no}"
-                res = requests.request("GET", url=page_url, headers=self.headers)
-                assert res.status_code == HTTPStatus.OK
-
-                soup = BeautifulSoup(res.content, "html.parser")
-
-                products = soup.find_all(class_="product_item_sm")
-
-                for product in products:
-                    product_data = product.find(class_="product_name")
-                    # item_title
-                    item_title = product_data.string.strip()
-                    # item_url
-                    item_url = product_data.a.get("href")
-                    # item_price
-                    try:
-                        price_data = product.find(class_="price")
-                        item_price = extract_price(price_data.string)
-                    except Exception:
-                        item_price = 0.0  # no price available
-
-                    # append item data to the dictionary
-                    items.append(
-                        {
-                            "item_title": item_title,
-                            "item_price": item_price,
-                            "item_url": domain_name.strip("/") + item_url
-                            if item_url
-                            else domain_name,
-                        }
-                    )
-
-                time.sleep(PAGES_SLEEP_INTERVAL)
-
-        except (
-            AssertionError,
-            requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            Exception,  # un-captured exception
-        ) as e:
-            error_message = (
-                f"""Error while trying to scrape {get_domain_name(base_url)}: '{e}'. \n"""
-                f"""StatusCode: {res.status_code}. \n"""
-                f"""Traceback: {traceback.format_exc()}."""
-            )
-            self.telegram_bot.send_error(error_message)
+    def _report_finish(
+        self, base_url: str, start_time: float, num_of_items: int
+    ) -> None:
+        """
+        Report the end of a website scrapping.
 
+        Args:
+            base_url (str): first page of the website.
+            start_time (float): start time.
+            num_of_items (int): number of scrapped items.
+        Return:
+            None
+        """
         # report to telegram
         self.telegram_bot.send_success(
-            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=local_now)} seconds."
-            f"\nCollected {len(items)} items.\n"
+            f"Finished scrapping {get_domain_name(base_url)} in {get_elapsed_time(start_time=start_time)} seconds."
+            f"\nCollected {num_of_items} items.\n"
         )
-
-        return items
@@ -0,0 +1,496 @@
+"""
+Declarative websites specs, and the engine that runs them.
+
+A website (see `sites.SITES`) is described by data:
+    - a pagination strategy: where its pages are (`SinglePage`, `PageNumbers` or `Offsets`),
+      and how many there are (`Count`, read from the first page).
+    - an `Items` spec: the items containers of a page, and the `Field` of every item value
+      (the price is a `Price` rule).
+    - optionally, a `JsonItems` spec: the same items from the structured data of a page
+      (a JSON endpoint, or JSON embedded in the page), read without building the page tree.
+Adding a website is adding a spec; every website runs through the same code.
+
+Elements are located by a path: a sequence of steps, from a page or an items container.
+A step is one of:
+    - "parent": the parent element.
+    - a tag name (str), e.g. "a": the first descendant tag.
+    - a dict: the first descendant matching `find(**step)`, e.g. {"class_": "price"};
+        {"css": <selector>} is the first descendant matching the CSS selector.
+    - a (dict or tag name, index) tuple: the index-th of all the matching descendants, e.g. ("a", -1).
+A missing element fails its field, as a missing attribute would.
+"""
+
+import json
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from bs4 import BeautifulSoup, Tag
+
+from prices import parse_price
+
+Step = Union[str, Dict, tuple]
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+# structured data of a page: the whole page is a JSON document (a JSON endpoint),
+# or JSON embedded in script tags (Next.js page data, JSON-LD)
+JSON_SOURCES = ("document", "next_data", "ld_json")
+_JSON_SCRIPT_PATTERNS = {
+    "next_data": re.compile(
+        rb"<script[^>]*\bid=[\"']__NEXT_DATA__[\"'][^>]*>(.*?)</script>", re.S
+    ),
+    "ld_json": re.compile(
+        rb"<script[^>]*\btype=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+        re.S,
+    ),
+}
+
+
+def select(element: Tag, path: Sequence[Step]) -> Tag:
+    """
+    Return the element at the end of a path (see the module docstring).
+
+    Args:
+        element (Tag): the start element (a page or an items container).
+        path (sequence): steps from `element`.
+    Returns:
+        element (Tag): the found element (`None` if the last step found nothing).
+    """
+    for step in path:
+        if step == "parent":
+            element = element.parent
+        elif isinstance(step, tuple):
+            query, index = step
+            if isinstance(query, dict):
+                element = element.find_all(**query)[index]
+            else:
+                element = element.find_all(query)[index]
+        elif isinstance(step, dict):
+            if "css" in step:
+                element = element.select_one(step["css"])
+            else:
+                element = element.find(**step)
+        else:
+            element = element.find(step)
+    return element
+
+
+class Field:
+    def __init__(self, *path: Step, get: str = "string", strip: bool = False) -> None:
+        """
+        A value of an element.
+
+        Args:
+            path (steps): path of the element (default the start element itself).
+            get (str): "string" (the single text child), "text" (all the text), or an attribute name.
+            strip (bool): strip the surrounding whitespace (default False).
+        """
+        self.path = path
+        self.get = get
+        self.strip = strip
+
+    def __call__(self, element: Tag):
+        element = select(element, self.path)
+        if self.get == "string":
+            # a plain string; a `NavigableString` drags its whole tree along (e.g. when pickled)
+            value = element.string
+            value = None if value is None else str(value)
+        elif self.get == "text":
+            value = element.text
+        else:
+            value = element.get(self.get)
+        return value.strip() if self.strip else value
+
+
+class Price:
+    def __init__(
+        self,
+        *alternatives: Callable[[Tag], str],
+        thousands_separator: bool = False,
+        default: float = 0.0,
+    ) -> None:
+        """
+        The price of an item; the first alternative that is found wins.
+
+        Args:
+            alternatives (callables): `Field`s (or functions of the items container) of the price text.
+            thousands_separator (bool): the comma is a thousands separator, not the decimal point.
+            default (float): price of an item without a price (default 0.0).
+        """
+        self.alternatives = alternatives
+        self.thousands_separator = thousands_separator
+        self.default = default
+
+    def __call__(self, element: Tag) -> float:
+        for alternative in self.alternatives:
+            try:
+                return parse_price(
+                    alternative(element),
+                    thousands_comma_separator=self.thousands_separator,
+                )
+            except Exception:
+                continue  # not found; next alternative
+        return self.default
+
+
+class Items:
+    def __init__(
+        self,
+        containers: Union[Dict, str],
+        title: Field,
+        url: Field,
+        price: Price,
+        within: Sequence[Step] = (),
+        every: int = 1,
+        absolute_urls: bool = False,
+    ) -> None:
+        """
+        The items of a page.
+
+        Args:
+            containers (dict|str): `find_all` query of the items containers (one per item).
+            title (Field): title of an item, from its container.
+            url (Field): url of an item, from its container.
+            price (Price): price of an item, from its container.
+            within (steps): path of the element that holds the containers (default the whole page).
+            every (int): keep one container every `every` matches (default all).
+            absolute_urls (bool): the items urls are absolute; not prefixed with the domain (default False).
+        """
+        self.containers = containers
+        self.title = title
+        self.url = url
+        self.price = price
+        self.within = within
+        self.every = every
+        self.absolute_urls = absolute_urls
+
+    def find_containers(self, soup: BeautifulSoup) -> List[Tag]:
+        """
+        Return the items containers of a page.
+        """
+        page = select(soup, self.within)
+        if isinstance(self.containers, dict):
+            containers = page.find_all(**self.containers)
+        else:
+            containers = page.find_all(self.containers)
+        return containers[:: self.every]
+
+    def extract(self, soup: BeautifulSoup, domain_name: str) -> List[Dict]:
+        """
+        Extract the items of a page.
+
+        Args:
+            soup (BeautifulSoup): the page tree.
+            domain_name (str): the website domain, prefixed to the relative items urls.
+        Returns:
+            items (list): list of the page's items.
+        """
+        items = list()
+        for container in self.find_containers(soup):
+            items.append(
+                {
+                    "item_title": self.title(container),
+                    "item_price": self.price(container),
+                    "item_url": _item_url(
+                        self.url(container), domain_name, self.absolute_urls
+                    ),
+                }
+            )
+        return items
+
+
+def _item_url(item_url: str, domain_name: str, absolute_urls: bool) -> str:
+    """
+    Return the full url of an item (the domain if the item has no url).
+    """
+    if not item_url:
+        return domain_name
+    return item_url if absolute_urls else domain_name.strip("/") + item_url
+
+
+def embedded_json(content: bytes, source: str) -> List:
+    """
+    Return the JSON documents of a page, without building its tree.
+
+    Args:
+        content (bytes): raw page content.
+        source (str): one of `JSON_SOURCES`.
+    Returns:
+        documents (list): the decoded documents; the malformed ones are skipped.
+    """
+    if source == "document":
+        try:
+            return [json.loads(content)]
+        except ValueError:
+            return list()  # not a JSON page
+
+    documents = list()
+    for raw_document in _JSON_SCRIPT_PATTERNS[source].findall(content):
+        try:
+            documents.append(json.loads(raw_document))
+        except ValueError:
+            continue
+    return documents
+
+
+def json_select(data, path: Sequence[Union[str, int]]):
+    """
+    Return the value at the end of a path of keys and list indexes; a "*" step
+    maps the rest of the path over all the elements of a list.
+    """
+    for i, step in enumerate(path):
+        if step == "*":
+            return [json_select(element, path[i + 1 :]) for element in data]
+        data = data[step]
+    return data
+
+
+class JsonField:
+    def __init__(self, *path: Union[str, int], template: str = None) -> None:
+        """
+        A value of a JSON product.
+
+        Args:
+            path (steps): keys and list indexes of the value (see `json_select`).
+            template (str): format of the value, e.g. "/products/{}" (default the value as is).
+        """
+        self.path = path
+        self.template = template
+
+    def __call__(self, product: Dict):
+        value = json_select(product, self.path)
+        return self.template.format(value) if self.template else value
+
+
+class JsonItems:
+    def __init__(
+        self,
+        source: str,
+        products: Sequence[Union[str, int]],
+        title: JsonField,
+        url: JsonField,
+        price: JsonField,
+        absolute_urls: bool = False,
+    ) -> None:
+        """
+        The items of a page, from its structured data (the fast path: no tree is built).
+
+        Args:
+            source (str): where the data is, one of `JSON_SOURCES`.
+            products (steps): path of the products list in the document (see `json_select`).
+            title (JsonField): title of an item, from its product.
+            url (JsonField): url of an item, from its product.
+            price (JsonField): price (or prices, the lowest wins) of an item, from its product.
+            absolute_urls (bool): the items urls are absolute; not prefixed with the domain (default False).
+        """
+        self.source = source
+        self.products = products
+        self.title = title
+        self.url = url
+        self.price = price
+        self.absolute_urls = absolute_urls
+
+    def _price(self, product: Dict) -> float:
+        try:
+            prices = self.price(product)
+        except (LookupError, TypeError):
+            return 0.0  # no price available
+        if not isinstance(prices, list):
+            prices = [prices]
+        prices = [parse_price(str(price)) for price in prices if price is not None]
+        return min(prices, default=0.0)
+
+    def extract(self, content: bytes, domain_name: str) -> Optional[List[Dict]]:
+        """
+        Extract the items of a page from its structured data.
+
+        Args:
+            content (bytes): raw page content.
+            domain_name (str): the website domain, prefixed to the relative items urls.
+        Returns:
+            items (list): list of the page's items (the products without a title or url are skipped);
+                `None` if the page has no such data.
+        """
+        for document in embedded_json(content, self.source):
+            try:
+                products = json_select(document, self.products)
+            except (LookupError, TypeError):
+                continue
+            if not isinstance(products, list):
+                continue
+
+            items = list()
+            for product in products:
+                try:
+                    items.append(
+                        {
+                            "item_title": self.title(product).strip(),
+                            "item_price": self._price(product),
+                            "item_url": _item_url(
+                                self.url(product), domain_name, self.absolute_urls
+                            ),
+                        }
+                    )
+                except (LookupError, TypeError, AttributeError):
+                    continue  # no title or url; skip the product, not the page
+            return items
+        return None
+
+
+class Count:
+    def __init__(
+        self,
+        field: Field,
+        default: int,
+        per_page: Union[int, Field] = None,
+        last_number: bool = False,
+        thousands_separator: bool = False,
+        offset: int = 0,
+    ) -> None:
+        """
+        A number read from the first page of a website: a number of pages or of items.
+
+        Args:
+            field (Field): text of the number, from the page.
+            default (int): number to use if it can't be read or is less than 1 (before the `offset`).
+            per_page (int|Field): items per page; the read number of items is turned into a
+                (rounded) number of pages (default the number is used as is).
+            last_number (bool): read the last number of the text, e.g. "Page 1 of 62" (default the first).
+            thousands_separator (bool): the comma is a thousands separator.
+            offset (int): added to the read number (default 0).
+        """
+        self.field = field
+        self.default = default
+        self.per_page = per_page
+        self.last_number = last_number
+        self.thousands_separator = thousands_separator
+        self.offset = offset
+
+    def _number(self, text: str) -> int:
+        if self.thousands_separator:
+            text = text.replace(",", "")
+        numbers = _NUMBER_PATTERN.findall(text.replace(",", "."))
+        return int(float(numbers[-1 if self.last_number else 0]))
+
+    def __call__(self, soup: BeautifulSoup) -> int:
+        try:
+            number = self._number(self.field(soup))
+            if self.per_page is not None:
+                per_page = self.per_page
+                if isinstance(per_page, Field):
+                    per_page = self._number(per_page(soup))
+                number = round(number / per_page)
+            if number < 1:
+                raise ValueError(f"{number} pages")
+        except Exception as e:
+            print("Error getting pages", e)
+            number = self.default
+        return number + self.offset
+
+
+class SinglePage:
+    """
+    A website of a single page: its first page.
+    """
+
+    def page_urls(
+        self, soup: BeautifulSoup, base_url: str, page_size: int = None
+    ) -> List[str]:
+        return [base_url]
+
+
+class PageNumbers:
+    def __init__(
+        self,
+        query: str,
+        count: Union[Count, Callable[[BeautifulSoup], Iterable[int]]],
+        first_page: int = 1,
+        base_page: int = 1,
+    ) -> None:
+        """
+        Numbered pages: <base_url><query>, e.g. "?page={}".
+
+        Args:
+            query (str): query of a page, appended to the base url; formatted with the page number.
+            count (Count|callable): number of pages; or a function of the first page that
+                returns the page numbers.
+            first_page (int): number of the first page (default 1).
+            base_page (int): number of the page that is the base url itself, whose response is
+                shared with the pages discovery (default 1); `None` if there is none.
+        """
+        self.query = query
+        self.count = count
+        self.first_page = first_page
+        self.base_page = base_page
+
+    def page_urls(
+        self, soup: BeautifulSoup, base_url: str, page_size: int = None
+    ) -> List[str]:
+        if isinstance(self.count, Count):
+            page_numbers = range(self.first_page, self.first_page + self.count(soup))
+        else:
+            page_numbers = self.count(soup)
+        return [
+            (
+                base_url
+                if page_no == self.base_page
+                else base_url + self.query.format(page_no)
+            )
+            for page_no in page_numbers
+        ]
+
+
+class Offsets:
+    # a full page may miss that many items (e.g. an ad tile in the products grid)
+    FULL_PAGE_SLACK = 1
+
+    def __init__(
+        self,
+        page_size: int,
+        count: Count,
+        count_pages: bool = False,
+        query: str = "?start={start}&sz={size}",
+        larger_page_sizes: Sequence[int] = (),
+    ) -> None:
+        """
+        Pages of `page_size` items: <base_url>?start=<first item>&sz=<page_size>.
+
+        Args:
+            page_size (int): number of items per page.
+            count (Count): number of items (or of pages of `page_size` items, see `count_pages`).
+            count_pages (bool): `count` is a number of pages (default a number of items).
+            query (str): query of a page, formatted with `start` and `size`.
+            larger_page_sizes (sequence): larger page sizes to try, in increasing order; the
+                scrapper uses the largest one the website honours (see `is_full`), for fewer requests.
+        """
+        self.page_size = page_size
+        self.count = count
+        self.count_pages = count_pages
+        self.query = query
+        self.larger_page_sizes = larger_page_sizes
+
+    def page_url(self, base_url: str, start: int, page_size: int) -> str:
+        """
+        Return the url of the page of `page_size` items from the `start` item.
+        """
+        return base_url + self.query.format(start=start, size=page_size)
+
+    def is_full(self, page_size: int, num_of_items: int) -> bool:
+        """
+        Return whether a page has all the items of its size (the website honoured the size).
+        """
+        return num_of_items >= page_size - self.FULL_PAGE_SLACK
+
+    def page_urls(
+        self, soup: BeautifulSoup, base_url: str, page_size: int = None
+    ) -> List[str]:
+        """
+        Return the urls of the pages of `page_size` items (default the spec `page_size`).
+        """
+        page_size = page_size or self.page_size
+        count = self.count(soup)
+        end = count * self.page_size if self.count_pages else count + 1
+        return [
+            self.page_url(base_url, start, page_size)
+            for start in range(0, end, page_size)
+        ]
@@ -0,0 +1,375 @@
+"""
+Websites definitions.
+Each website is a declarative spec (see `site_specs.py`): its pagination and its items
+selectors, run by the same pages discovery and items extraction code in all the scrapping engines.
+
+SITES: website name -> definition:
+    - domain_name (str): The website domain, prefixed to the relative items urls.
+    - base_url (str): The first page to request.
+    - pagination (SinglePage|PageNumbers|Offsets): The pages to scrape, discovered from the first page.
+    - items (Items): The items containers and fields of a page.
+    - json_items (JsonItems, optional): The items of a page from its structured data (a JSON endpoint,
+        `__NEXT_DATA__` or JSON-LD), without building the page tree; the `items` are the fallback
+        of the embedded data (the pages of a JSON endpoint have no tree to fall back to).
+    - parser (str, optional): HTML parser backend of the website (default `constants.HTML_PARSER`).
+    - parse_only (SoupStrainer, optional): The part of the items pages that `extract_items` needs;
+        only that part of the tree is built. Leave it out if the items are found through their parents.
+    - fan_out (bool, optional): Request the pages `constants.FAN_OUT_PAGES` at a time (up to twice as many
+        ahead of the parsing), instead of a few pages ahead of the parsing (threads engine).
+        For websites with many pages known up front.
+    - items_marker (bytes, optional): Raw bytes that precede all the items of a page (e.g. the class of
+        the items containers); the page fingerprint covers the page from there (default the whole page).
+    - items_end_marker (bytes, optional): Raw bytes that follow all the items of a page; the page
+        fingerprint stops there (default the end of the page).
+
+# List of urls:
+# COMPLETED
+# https://plaidonline.com/products?closeout=True
+# https://www.enasco.com/c/Clearance
+# https://www.nordstromrack.com/clearance
+# https://www.altomusic.com/by-category/hot-deals/on-sale
+# https://www.muscleandstrength.com/store/category/clearance.html
+# https://camerareadycosmetics.com/collections/makeup-sale
+# https://www.officesupply.com/clearance
+# https://www.gamestop.com/deals
+# https://www.scheels.com/c/all/sale
+# https://www.academy.com/c/shops/sale
+# https://www.4sgm.com/category/536/Top-Deals.html?minPrice=&maxPrice=&minQty=&sort=inventory_afs&facetNameValue=Category_value_Top+Deals&size=100&page={page}
+
+
+# CHECKED - NOT WORKING ¯\_(ツ)_/¯
+# https://chesapeake.yankeecandle.com/chesapeake-bay-candle/sale/ # blocked by robots.txt, <Response [403]>
+# https://www.gamenerdz.com/sale-clearance # dynamic website - JS to load content
+# https://www.dickblick.com/products/wacky-links-sets/?fromSearch=%2Fclearance%2F # dynamic website - JS to load content
+# https://entirelypetspharmacy.com/s.html?tag=sale-specials # dynamic website - JS to load content
+# https://www.shopatdean.com/collections/clearance-closeouts-overstock #  dynamic website - JS to load content
+
+# TODO RE-CHECK
+# WIP
+
+"""
+
+from typing import Iterable
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+from site_specs import (
+    Count,
+    Field,
+    Items,
+    JsonField,
+    JsonItems,
+    Offsets,
+    PageNumbers,
+    Price,
+)
+
+
+### plaidonline
+def plaidonline_page_numbers(soup: BeautifulSoup) -> Iterable[int]:
+    # get number of pages
+    # it is 5 pages, but I don't want to hard code it incase it increases
+    try:
+        raw_pages_data = soup.find(class_="PagerNumberArea").find_all("span")[3]
+        no_of_pages = []
+        selected_page = raw_pages_data.find(class_="SelectedPage").string
+        no_of_pages.append(selected_page)
+        unselected_pages = raw_pages_data.find_all(class_="UnselectedPage")
+        for unselected_page in unselected_pages:
+            no_of_pages.append(unselected_page.string)
+
+        return sorted(map(int, no_of_pages))
+    except Exception as e:
+        print("Error getting pages", e)
+        return range(1, 5 + 1)
+
+
+### altomusic
+def altomusic_price(product: Tag) -> str:
+    # combine price with decimal
+    init_price = product.find(class_="price").string
+    dec_price = product.find(class_="decimal")
+    if dec_price:
+        init_price += dec_price.string
+    return init_price
+
+
+### academy
+def academy_price(product: Tag) -> str:
+    price_data = product.find(class_="product-price").find("span")
+    # combine price with decimal
+    init_price = price_data.find("span").string
+    dec_price = price_data.find_all("sup")[-1]
+    if dec_price and int(dec_price.string):
+        init_price += f".{dec_price.string}"
+    return init_price
+
+
+SITES = {
+    "plaidonline": {
+        "domain_name": "https://plaidonline.com/",
+        "base_url": "https://plaidonline.com/products?closeout=True",
+        "pagination": PageNumbers("&page={}", plaidonline_page_numbers),
+        # each item has 2 "price" classes; skip the second one
+        "items": Items(
+            {"class_": "price"},
+            every=2,
+            title=Field("parent", "h3", get="text"),
+            url=Field("parent", "parent", "parent", "parent", "a", get="href"),
+            price=Price(Field(get="text")),
+        ),
+        # items are found through their parents; keep the exact tree of "html.parser"
+        "parser": "html.parser",
+    },
+    "enasco": {
+        "domain_name": "https://www.enasco.com/",
+        "base_url": "https://www.enasco.com/c/Clearance",
+        # 'Page\n\t\t\t\t1 of 62' > get the max number after 'of'
+        "pagination": PageNumbers(
+            "?page={}&gridstyle=gridStyle&text=&q=%3Arelevance",
+            Count(
+                Field({"class_": "pagination-data_view"}, get="text"),
+                default=62,
+                last_number=True,
+            ),
+            first_page=0,
+            base_page=None,
+        ),
+        "items": Items(
+            {
+                "class_": "similar-products__item col-xs-12 col-sm-6 col-md-4 slp-eq-height"
+            },
+            title=Field({"class_": "row-eq-height ea-product-cell-name"}, "a"),
+            url=Field(
+                {"class_": "row-eq-height ea-product-cell-name"}, "a", get="href"
+            ),
+            # after price - if exists, else only old price
+            price=Price(
+                Field({"class_": "ea-product-cell-price"}),
+                Field({"class_": "similar-products__data_old-price"}),
+            ),
+        ),
+        "parse_only": SoupStrainer(
+            class_="similar-products__item col-xs-12 col-sm-6 col-md-4 slp-eq-height"
+        ),
+        "items_marker": b"similar-products__item",
+    },
+    "nordstromrack": {
+        "domain_name": "https://www.nordstromrack.com/",
+        "base_url": "https://www.nordstromrack.com/clearance",
+        "pagination": PageNumbers(
+            "?page={}",
+            Count(
+                Field({"class_": "jHG4O"}, get="text"),
+                default=140,
+                per_page=72,
+                thousands_separator=True,
+            ),
+        ),
+        "items": Items(
+            {"class_": "ivm_G _PT1R"},
+            title=Field({"class_": "kKGYj TpwNx"}, "a"),
+            url=Field({"class_": "kKGYj TpwNx"}, "a", get="href"),
+            # the lowest price (first price of a range), else the single price
+            price=Price(
+                Field({"css": "span.qHz0a.BkySr.EhCiu.t1yis.sxEtG.jRV6p"}),
+                Field({"css": "span.qHz0a.EhCiu.t1yis.sxEtG.jRV6p"}),
+            ),
+        ),
+        "parse_only": SoupStrainer(class_="ivm_G _PT1R"),
+        "items_marker": b"ivm_G _PT1R",
+    },
+    "altomusic": {
+        "domain_name": "https://www.altomusic.com/",
+        "base_url": "https://www.altomusic.com/by-category/hot-deals/on-sale",
+        "pagination": PageNumbers(
+            "?p={}",
+            Count(
+                Field(({"attrs": {"class": "toolbar-number"}}, -1)),
+                default=23,
+                per_page=Field(({"attrs": {"class": "toolbar-number"}}, 1)),
+                thousands_separator=True,
+            ),
+        ),
+        "items": Items(
+            {"attrs": {"class": "details"}},
+            title=Field({"class_": "product-item-link"}, strip=True),
+            url=Field({"class_": "product-item-link"}, get="href"),
+            price=Price(altomusic_price),
+            absolute_urls=True,
+        ),
+        "parse_only": SoupStrainer(attrs={"class": "details"}),
+        "items_marker": b"details",
+    },
+    "muscleandstrength": {
+        "domain_name": "https://www.muscleandstrength.com/",
+        "base_url": "https://www.muscleandstrength.com/store/category/clearance.html",
+        "pagination": PageNumbers(
+            "?p={}",
+            Count(
+                Field({"class_": "search-result-available-count"}),
+                default=9,
+                per_page=20,  # tested
+            ),
+        ),
+        "items": Items(
+            {"class_": "cell small-12 bp600-6 bp960-4 large-3 grid-product"},
+            title=Field({"class_": "product-name"}, strip=True),
+            url=Field({"class_": "product-name"}, get="href"),
+            price=Price(Field({"class_": "price"})),
+        ),
+        "parse_only": SoupStrainer(
+            class_="cell small-12 bp600-6 bp960-4 large-3 grid-product"
+        ),
+        "items_marker": b"grid-product",
+    },
+    "camerareadycosmetics": {
+        "domain_name": "https://camerareadycosmetics.com/",
+        "base_url": "https://camerareadycosmetics.com/collections/makeup-sale",
+        # shopify store: the collection products JSON, up to 250 products per page;
+        # the number of collection pages (of fewer products) covers them all
+        "pagination": PageNumbers(
+            "/products.json?limit=250&page={}",
+            Count(Field(({"class_": "page"}, -1), "a"), default=2),
+            base_page=None,
+        ),
+        "json_items": JsonItems(
+            "document",
+            ("products",),
+            title=JsonField("title"),
+            url=JsonField("handle", template="/collections/makeup-sale/products/{}"),
+            price=JsonField("variants", "*", "price"),
+        ),
+        "items": Items(
+            {"attrs": {"class": "grid-item"}},
+            title=Field({"class_": "grid-product__title"}, "a", strip=True),
+            url=Field({"class_": "grid-product__title"}, "a", get="href"),
+            price=Price(
+                Field(
+                    {"attrs": {"class": "grid-product__price--current"}},
+                    {"name": "span", "class_": "money"},
+                )
+            ),
+        ),
+        "parse_only": SoupStrainer(attrs={"class": "grid-item"}),
+        "items_marker": b"grid-item",
+    },
+    "officesupply": {
+        "domain_name": "https://www.officesupply.com/",
+        "base_url": "https://www.officesupply.com/clearance",
+        "pagination": PageNumbers(
+            "?page={}",
+            Count(
+                Field(({"class_": "page"}, -1), "a"),
+                default=1,  # the landing page only
+            ),
+        ),
+        "items": Items(
+            {"class_": "product-details"},
+            title=Field({"class_": "title"}, "span"),
+            url=Field({"class_": "title"}, "a", get="href"),
+            price=Price(Field("parent", {"class_": "price"}, "span", strip=True)),
+        ),
+        # items are found through their parents; keep the exact tree of "html.parser"
+        "parser": "html.parser",
+        "fan_out": True,
+    },
+    "gamestop": {
+        "domain_name": "https://www.gamestop.com/",
+        "base_url": "https://www.gamestop.com/deals",
+        # page_size: increase by multiples of 24 to increase speed.
+        # NOTE the request will take more time.
+        "pagination": Offsets(
+            24 * 4,
+            Count(
+                Field({"name": "span", "class_": "pageResults"}),
+                default=12412,  # ~
+                thousands_separator=True,
+            ),
+            larger_page_sizes=(24 * 8, 24 * 16),
+        ),
+        "fan_out": True,
+        "items": Items(
+            {"class_": "product grid-tile"},
+            within=({"class_": "product-grid-wrapper"},),
+            title=Field({"class_": "tile-body"}, {"class_": "link-name"}, "p"),
+            url=Field({"class_": "tile-body"}, {"class_": "link-name"}, get="href"),
+            price=Price(Field({"class_": "actual-price"}, strip=True)),
+        ),
+        "parse_only": SoupStrainer(class_="product-grid-wrapper"),
+        "items_marker": b"product-grid-wrapper",
+    },
+    "scheels": {
+        "domain_name": "https://www.scheels.com/",
+        "base_url": "https://www.scheels.com/c/all/sale",
+        # page_size: increase by multiples of 24 - 1 (one ad) to increase speed.
+        # NOTE the request will take more time.
+        "pagination": Offsets(
+            47,  # Optimum number of items per page
+            Count(Field({"class_": "page-last"}, get="text"), default=265),
+            count_pages=True,
+            larger_page_sizes=(24 * 4 - 1, 24 * 8 - 1),
+        ),
+        "fan_out": True,
+        "items": Items(
+            {"class_": "tile-inner"},
+            title=Field({"class_": "name-link"}, strip=True),
+            url=Field({"class_": "name-link"}, get="href"),
+            price=Price(
+                Field({"attrs": {"itemprop": "price"}}, strip=True),
+                thousands_separator=True,
+            ),
+        ),
+        "parse_only": SoupStrainer(class_="tile-inner"),
+        "items_marker": b"tile-inner",
+    },
+    "academy": {
+        "domain_name": "https://www.academy.com/",
+        "base_url": "https://www.academy.com/c/shops/sale",
+        "pagination": PageNumbers(
+            "?&page_{}",
+            Count(
+                Field(
+                    {"attrs": {"data-auid": "NumberRangeNavigation"}},
+                    ("a", -1),
+                    get="text",
+                ),
+                default=52,  # ~
+                offset=-1,  # no_of_pages -1
+            ),
+        ),
+        "items": Items(
+            {"class_": "css-18cbcd1"},
+            title=Field({"class_": "product-card-simple-title css-dfh7vc"}, strip=True),
+            url=Field({"class_": "product-card-simple-title css-dfh7vc"}, get="href"),
+            price=Price(academy_price),
+        ),
+        "parse_only": SoupStrainer(class_="css-18cbcd1"),
+        "items_marker": b"css-18cbcd1",
+    },
+    "4sgm": {
+        "domain_name": "https://www.4sgm.com/",
+        "base_url": (
+            "https://www.4sgm.com/category/536/Top-Deals.html"
+            "?minPrice=&maxPrice=&minQty=&sort=inventory_afs&facetNameValue=Category_value_Top+Deals&size=100"
+        ),
+        "pagination": PageNumbers(
+            "&page={}",
+            Count(
+                Field(
+                    {"class_": "pageNumber"},
+                    ({"attrs": {"class": "control-label"}}, -1),
+                ),
+                default=53,  # ~
+            ),
+        ),
+        "items": Items(
+            {"class_": "product_item_sm"},
+            title=Field({"class_": "product_name"}, strip=True),
+            url=Field({"class_": "product_name"}, "a", get="href"),
+            price=Price(Field({"class_": "price"})),
+        ),
+        "parse_only": SoupStrainer(class_="product_item_sm"),
+        "items_marker": b"product_item_sm",
+    },
+}
@@ -0,0 +1,225 @@
+"""
+Items storage backends.
+
+Every backend has the same interface:
+    - count(): number of stored items.
+    - load(keys): stored items (`DATA_COLUMNS`) of the given item keys (default all).
+    - save(item_store, keys): persist the items after a reconcile (`keys` are the changed items).
+    - close(): release the storage.
+
+Backends (`STORAGE_BACKEND`):
+    - "csv": the data file, fully loaded once and fully rewritten every run.
+    - "parquet": append-only price history (see `price_history.py`); the current items are read
+        once per run from a compacted file, not from the history.
+    - "sqlite": embedded database; only the scraped items are read and only the changed ones written.
+"""
+
+import os
+from pathlib import Path
+import sqlite3
+from typing import Iterable
+
+import pandas as pd
+
+from constants import (
+    DATA_DIR,
+    DATA_FILE_NAME,
+    DATA_COLUMNS,
+    DB_FILE_NAME,
+    STORAGE_BACKEND,
+)
+from helpers import load_data, save_data
+from item_store import ItemStore
+from price_history import PriceHistoryStore
+
+
+def _select(frame: pd.DataFrame, keys: Iterable[str] = None) -> pd.DataFrame:
+    """
+    Select the items of the given keys (default all) from a frame indexed by item key.
+    """
+    if keys is not None:
+        positions = frame.index.get_indexer(list(dict.fromkeys(keys)))
+        frame = frame.iloc[positions[positions >= 0]]
+    return frame.reset_index().reindex(columns=DATA_COLUMNS)
+
+
+class CsvStorage:
+    def __init__(
+        self, data_dir: str = DATA_DIR, data_file_name: str = DATA_FILE_NAME
+    ) -> None:
+        self.data_dir = data_dir
+        self.data_file_name = data_file_name
+        self._frame = None
+
+    def _stored(self) -> pd.DataFrame:
+        if self._frame is None:
+            data = load_data(self.data_dir, self.data_file_name)
+            self._frame = ItemStore.from_dataframe(data).frame
+        return self._frame
+
+    def count(self) -> int:
+        return len(self._stored())
+
+    def load(self, keys: Iterable[str] = None) -> pd.DataFrame:
+        return _select(self._stored(), keys)
+
+    def save(self, item_store: ItemStore, keys: Iterable[str]) -> None:
+        # the file holds all the items; rewrite it with the updated and the new items
+        stored = self._stored().copy()
+        items = item_store.frame
+        exists = items.index.isin(stored.index)
+        stored.loc[items.index[exists]] = items[exists]
+        self._frame = pd.concat([stored, items[~exists]])
+        save_data(_select(self._frame), self.data_dir, self.data_file_name)
+
+    def close(self) -> None:
+        pass
+
+
+class ParquetStorage:
+    def __init__(self, data_dir: str = DATA_DIR) -> None:
+        self.price_history = PriceHistoryStore(data_dir)
+        if self.price_history.is_empty():
+            self.price_history.import_dataframe(
+                load_data(data_dir)
+            )  # migrate the csv file
+
+    def count(self) -> int:
+        return self.price_history.count()
+
+    def load(self, keys: Iterable[str] = None) -> pd.DataFrame:
+        keys = None if keys is None else list(keys)
+        frame = ItemStore.from_dataframe(self.price_history.load(keys)).frame
+        return _select(frame, keys)
+
+    def save(self, item_store: ItemStore, keys: Iterable[str]) -> None:
+        # append only the changed items
+        self.price_history.append(item_store.to_dataframe(dict.fromkeys(keys)))
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteStorage:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            item_title TEXT PRIMARY KEY,
+            site TEXT,
+            item_price REAL,
+            item_url TEXT,
+            added_on TEXT,
+            updated_on TEXT
+        );
+        CREATE INDEX IF NOT EXISTS items_site ON items (site);
+    """
+    UPSERT = """
+        INSERT INTO items (item_title, site, item_price, item_url, added_on, updated_on)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (item_title) DO UPDATE SET
+            site = excluded.site,
+            item_price = excluded.item_price,
+            item_url = excluded.item_url,
+            updated_on = excluded.updated_on
+    """
+
+    def __init__(
+        self, data_dir: str = DATA_DIR, db_file_name: str = DB_FILE_NAME
+    ) -> None:
+        """
+        Open (or create) the database. A new database imports the existing csv data file.
+
+        Args:
+            data_dir (str): Data directory (default /data)
+            db_file_name (str): Name of the database file (default data.db)
+        """
+        full_dir_path = os.path.join(Path(__file__).parent.resolve(), data_dir)
+        if not os.path.exists(full_dir_path):
+            os.makedirs(full_dir_path)
+
+        self.connection = sqlite3.connect(os.path.join(full_dir_path, db_file_name))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+        if not self.count():
+            self.import_csv(data_dir)
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def load(self, keys: Iterable[str] = None) -> pd.DataFrame:
+        columns = ", ".join(f"items.{column}" for column in DATA_COLUMNS)
+        if keys is None:
+            return pd.read_sql_query(f"SELECT {columns} FROM items", self.connection)
+
+        # join on a temporary table of the keys; no huge `IN (...)` lists
+        self.connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS wanted_keys (item_title TEXT PRIMARY KEY)"
+        )
+        with self.connection:
+            self.connection.execute("DELETE FROM wanted_keys")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO wanted_keys VALUES (?)",
+                ((key,) for key in keys),
+            )
+        return pd.read_sql_query(
+            f"SELECT {columns} FROM items JOIN wanted_keys USING (item_title)",
+            self.connection,
+        )
+
+    def upsert(self, items: pd.DataFrame) -> None:
+        """
+        Insert or update items, in a single transaction.
+
+        Args:
+            items (pd.DataFrame): items with the `DATA_COLUMNS` columns.
+        Returns:
+            None
+        """
+        items = items.reindex(columns=DATA_COLUMNS).astype(object)
+        items = items.where(items.notna(), None)
+        sites = items["item_url"].str.extract(
+            r"^(?:https?://)?(?:www\.)?([^/]+)", expand=False
+        )
+        rows = zip(
+            items["item_title"],
+            sites.where(sites.notna(), None),
+            items["item_price"],
+            items["item_url"],
+            items["added_on"],
+            items["updated_on"],
+        )
+        with self.connection:
+            self.connection.executemany(self.UPSERT, rows)
+
+    def save(self, item_store: ItemStore, keys: Iterable[str]) -> None:
+        self.upsert(item_store.to_dataframe(dict.fromkeys(keys)))
+
+    def import_csv(
+        self, data_dir: str = DATA_DIR, data_file_name: str = DATA_FILE_NAME
+    ) -> None:
+        """
+        Import the items of a csv data file.
+
+        Args:
+            data_dir (str): Data directory (default /data)
+            data_file_name (str): Name of the CSV file (default data.csv)
+        Returns:
+            None
+        """
+        data = load_data(data_dir, data_file_name)
+        self.upsert(ItemStore.from_dataframe(data).to_dataframe())
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def get_storage(backend: str = STORAGE_BACKEND):
+    """
+    Return the items storage of the given backend ("csv", "parquet" or "sqlite").
+    """
+    if backend == "sqlite":
+        return SQLiteStorage()
+    if backend == "parquet":
+        return ParquetStorage()
+    return CsvStorage()
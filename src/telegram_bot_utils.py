@@ -1,17 +1,287 @@
 """
 Telegram bot Class and helpers methods.
+
+Items notifications (new items, price updates) are sent according to `NOTIFICATIONS_MODE`:
+    - "each": one message per item.
+    - "batch": the items messages are packed into as few messages as possible
+        (up to `MESSAGE_MAX_LENGTH` characters), sent on `flush()` or before any other message.
+    - "digest": one compact digest of all the items of the run, sent on `send_digest()`.
+
+Messages are never sent by the caller: they are queued and posted by a background
+sender, within the telegram rate limits. The queue is flushed at exit
+(or on `TelegramBot.close()`), for at most `TELEGRAM_FLUSH_TIMEOUT` seconds; the messages
+still queued then are saved (`TELEGRAM_OUTBOX_FILE_NAME`) and sent first on the next run.
 """
 
+import atexit
+from collections import deque
+import json
+import os
+from pathlib import Path
+import random
+import re
+import threading
+import time
+from typing import Iterable, List
+
 from telegram import Bot, ParseMode
-from telegram.error import RetryAfter, TimedOut
+from telegram.error import (
+    BadRequest,
+    NetworkError,
+    RetryAfter,
+    TelegramError,
+    TimedOut,
+)
+
+from constants import (
+    DATA_DIR,
+    TELEGRAM_BOT_API_KEY,
+    CHAT_ID,
+    NOTIFICATIONS_MODE,
+    TELEGRAM_MIN_INTERVAL,
+    TELEGRAM_MESSAGES_PER_MINUTE,
+    TELEGRAM_MESSAGES_PER_SECOND,
+    TELEGRAM_MAX_ATTEMPTS,
+    TELEGRAM_FLUSH_TIMEOUT,
+    TELEGRAM_OUTBOX_FILE_NAME,
+)
+
+# telegram messages limit
+MESSAGE_MAX_LENGTH = 4096
+
+# HTML tags of a message, removed when printed to stdout
+_HTML_TAG_PATTERN = re.compile(r"<.*?>")
+
+
+def _message_length(message: str) -> int:
+    # telegram counts UTF-16 code units; the HTML tags are counted too, to stay on the safe side
+    return len(message.encode("utf-16-le")) // 2
+
+
+def pack_messages(
+    messages: Iterable[str],
+    max_length: int = MESSAGE_MAX_LENGTH,
+    separator: str = "\n\n",
+) -> List[str]:
+    """
+    Pack messages into as few messages as possible, without splitting any of them.
+
+    Args:
+        messages (iterable): messages to pack.
+        max_length (int): maximum length of a packed message.
+        separator (str): separator between the packed messages.
+    Returns:
+        packed (list): packed messages (a message longer than `max_length` is left alone).
+    """
+    packed = list()
+    current, current_length = list(), 0
+    separator_length = _message_length(separator)
+    for message in messages:
+        length = _message_length(message)
+        if current and current_length + separator_length + length > max_length:
+            packed.append(separator.join(current))
+            current, current_length = list(), 0
+        current_length += (separator_length if current else 0) + length
+        current.append(message)
+    if current:
+        packed.append(separator.join(current))
+    return packed
+
+
+class _Outbox:
+    """
+    Outbound messages queue, posted in order by a background thread.
+
+    Rate limits, per chat: at least `min_interval` seconds between two messages,
+    and at most `per_minute` messages in any minute; across all the chats: a token
+    bucket of `per_second` messages per second, without bursts (at most `per_second`
+    messages in any second).
+    `RetryAfter` errors are waited exactly; network errors are retried with
+    jittered exponential backoff, up to `max_attempts` attempts.
+
+    A message stays queued until it is sent (or dropped); the messages that are still
+    queued when `flush` times out are saved to `path`, see `resend_unsent`.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = TELEGRAM_MIN_INTERVAL,
+        per_minute: int = TELEGRAM_MESSAGES_PER_MINUTE,
+        per_second: float = TELEGRAM_MESSAGES_PER_SECOND,
+        max_attempts: int = TELEGRAM_MAX_ATTEMPTS,
+        path: str = None,
+    ) -> None:
+        self.min_interval = min_interval
+        self.per_minute = per_minute
+        self.per_second = per_second
+        self.max_attempts = max_attempts
+        self.path = path or os.path.join(
+            Path(__file__).parent.resolve(), DATA_DIR, TELEGRAM_OUTBOX_FILE_NAME
+        )
+        self._tokens = 1  # global bucket, used by the sender thread only
+        self._tokens_updated_at = time.monotonic()
+        self._messages = deque()  # (bot_client, chat_id, message), until sent
+        self._sent_at = dict()  # chat_id: times of the messages of the last minute
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def put(self, bot_client: Bot, chat_id: int, message: str) -> None:
+        """
+        Queue a message; return right away.
+        """
+        with self._condition:
+            self._messages.append((bot_client, chat_id, message))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="telegram-sender", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout: float = TELEGRAM_FLUSH_TIMEOUT) -> bool:
+        """
+        Wait until all the queued messages are sent, at most `timeout` seconds;
+        save the messages that are still queued then.
+
+        Returns:
+            flushed (bool): `False` if some messages were saved instead of sent.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._messages:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    unsent = [
+                        {"chat_id": chat_id, "message": message}
+                        for _, chat_id, message in self._messages
+                    ]
+                    self._messages.clear()
+                    self._save_unsent(self._load_unsent() + unsent)
+                    print(
+                        f"Telegram: {len(unsent)} message/s not sent, saved for the next run."
+                    )
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def resend_unsent(self, bot_client: Bot, chat_id: int) -> None:
+        """
+        Queue the saved messages of a chat (see `flush`), before any new message.
+        """
+        unsent = self._load_unsent()
+        resent = [entry for entry in unsent if entry["chat_id"] == chat_id]
+        if not resent:
+            return
+        self._save_unsent([entry for entry in unsent if entry["chat_id"] != chat_id])
+        for entry in resent:
+            self.put(bot_client, chat_id, entry["message"])
+
+    def _load_unsent(self) -> List[dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return list()
+
+    def _save_unsent(self, unsent: List[dict]) -> None:
+        if not unsent:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(unsent, f, ensure_ascii=False)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._messages:
+                    self._condition.wait()
+                entry = self._messages[0]
+            try:
+                self._deliver(*entry)
+            finally:
+                with self._condition:
+                    # unless it was saved meanwhile (`flush` timed out)
+                    if self._messages and self._messages[0] is entry:
+                        self._messages.popleft()
+                    self._condition.notify_all()
+
+    def _wait_for_slot(self, chat_id: int) -> None:
+        sent_at = self._sent_at.setdefault(chat_id, deque())
+        now = time.monotonic()
+        while sent_at and sent_at[0] <= now - 60:
+            sent_at.popleft()
+
+        delay = 0
+        if sent_at:
+            delay = sent_at[-1] + self.min_interval - now
+        if len(sent_at) >= self.per_minute:
+            delay = max(delay, sent_at[0] + 60 - now)
+        if delay > 0:
+            time.sleep(delay)
+        self._take_global_token()
+        sent_at.append(time.monotonic())
+
+    def _take_global_token(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            1,
+            self._tokens + (now - self._tokens_updated_at) * self.per_second,
+        )
+        self._tokens_updated_at = now
+        if self._tokens < 1:
+            time.sleep((1 - self._tokens) / self.per_second)
+            self._tokens, self._tokens_updated_at = 1, time.monotonic()
+        self._tokens -= 1
+
+    def _deliver(self, bot_client: Bot, chat_id: int, message: str) -> None:
+        backoff = 1
+        for attempt in range(1, self.max_attempts + 1):
+            self._wait_for_slot(chat_id)
+            try:
+                bot_client.send_message(
+                    chat_id=chat_id, text=f"{message}", parse_mode=ParseMode.HTML
+                )
+                return
+            except RetryAfter as e:
+                print(f"Telegram flood control, retrying in {e.retry_after} seconds.")
+                time.sleep(e.retry_after)
+            except BadRequest as e:  # a subclass of `NetworkError`; retrying won't help
+                print(f"Error sending message, '{e.message}'. Dropped.")
+                return
+            except (TimedOut, NetworkError) as e:
+                delay = backoff * random.uniform(0.5, 1.5)
+                print(
+                    f"Error sending message, '{e.message}'. Retrying in {delay:.1f} seconds."
+                )
+                time.sleep(delay)
+                backoff *= 2
+            except TelegramError as e:  # unauthorized... retrying won't help
+                print(f"Error sending message, '{e.message}'. Dropped.")
+                return
+            except Exception as e:  # -_-
+                print(f"Error sending message, '{e}'. Dropped.")
+                return
+        print(f"Error sending message, gave up after {self.max_attempts} attempts.")
+
 
-from constants import TELEGRAM_BOT_API_KEY, CHAT_ID
+# shared by all the bots; the rate limits are per chat and global
+_outbox = _Outbox()
+atexit.register(_outbox.flush)
 
 
 class TelegramBot:
-    def __init__(self) -> None:
+    def __init__(self, mode: str = NOTIFICATIONS_MODE) -> None:
         self.bot_client = Bot(TELEGRAM_BOT_API_KEY)
         self.chat_id = CHAT_ID
+        self.mode = mode
+        # the messages that the previous run could not send
+        _outbox.resend_unsent(self.bot_client, self.chat_id)
+        self._batch = list()  # items messages ("batch" mode)
+        self._batch_length = 0
+        self._digest = {"ADD": list(), "DOWN": list(), "UP": list()}  # "digest" mode
+        self._lock = threading.Lock()
         self.emojis = {
             "ALERT": "⚠️⚠️",
             "ERROR": "❌❌",
@@ -37,32 +307,106 @@ class TelegramBot:
 
         if stdout:
             """Send before adding emoji to stdout and clean HTML tags"""
-            import re
-
-            pattern = re.compile(r"<.*?>")
-            message_ = pattern.sub("", message)
+            message_ = _HTML_TAG_PATTERN.sub("", message)
             print(message_)
 
         if emoji in self.emojis.keys():
             message = f"{self.emojis.get(emoji)}  {message}"
 
-        try:
-            self.bot_client.send_message(
-                chat_id=self.chat_id, text=f"{message}", parse_mode=ParseMode.HTML
-            )
-        except Exception as e:
-            print(f"Error sending message, '{e.message}'. Retrying in 1 second.")
+        # keep the chronological order
+        self.flush()
+        self._post(message)
 
-            # maybe timeout - try to cool down
-            from time import sleep
+    def _post(self, message: str) -> None:
+        """
+        Queue a message to the telegram chat.
+        Args:
+            message (str): message to send.
+        Returns:
+            None
+        """
+        _outbox.put(self.bot_client, self.chat_id, message)
 
-            sleep(1)
-            try:
-                self.bot_client.send_message(
-                    chat_id=self.chat_id, text=f"{message}", parse_mode=ParseMode.HTML
+    def _send_item_message(self, message: str, emoji: str, digest_line: str) -> None:
+        """
+        Send an item message, according to the notifications mode.
+        Args:
+            message (str): message to send.
+            emoji (str): prefix emoji to use before message.
+            digest_line (str): short version of the message, for the digest.
+        Returns:
+            None
+        """
+        if self.mode == "digest":
+            with self._lock:
+                self._digest[emoji].append(digest_line)
+        elif self.mode == "batch":
+            message = f"{self.emojis.get(emoji)}  {message}"
+            length = _message_length(message)
+            with self._lock:
+                if self._batch_length + length + 2 > MESSAGE_MAX_LENGTH:
+                    full_batch, self._batch = self._batch, list()
+                    self._batch_length = 0
+                else:
+                    full_batch = None
+                self._batch.append(message)
+                self._batch_length += length + 2
+            if full_batch:
+                self._post_all(pack_messages(full_batch))
+        else:
+            self._send_message(message=message, emoji=emoji)
+
+    def _post_all(self, messages: List[str]) -> None:
+        for message in messages:
+            self._post(message)
+
+    def flush(self) -> None:
+        """
+        Send the batched items messages ("batch" mode).
+
+        Returns:
+            None
+        """
+        with self._lock:
+            batch, self._batch = self._batch, list()
+            self._batch_length = 0
+        self._post_all(pack_messages(batch))
+
+    def send_digest(self) -> None:
+        """
+        Send the digest of the items of the run ("digest" mode).
+
+        Returns:
+            None
+        """
+        with self._lock:
+            digest = self._digest
+            self._digest = {emoji: list() for emoji in digest}
+
+        titles = {
+            "ADD": "New items",
+            "DOWN": "Decreased prices",
+            "UP": "Increased prices",
+        }
+        lines = list()
+        for emoji, digest_lines in digest.items():
+            if digest_lines:
+                lines.append(
+                    f"{self.emojis[emoji]}  <b>{titles[emoji]} ({len(digest_lines)}):</b>"
                 )
-            except Exception as e:  # -_-
-                print(f"Error sending message again, '{e.message}'.")
+                lines.extend(digest_lines)
+        self.flush()
+        self._post_all(pack_messages(lines, separator="\n"))
+
+    def close(self, timeout: float = TELEGRAM_FLUSH_TIMEOUT) -> None:
+        """
+        Send the batched messages, and wait for the queued messages to be sent (at most `timeout` seconds).
+
+        Returns:
+            None
+        """
+        self.flush()
+        _outbox.flush(timeout)
 
     def send_new_item_added(
         self, item_title: str, item_url: str, item_price: float
@@ -82,8 +426,9 @@ class TelegramBot:
             f"<b>Hey! A new item was added!</b>\n"
             f"<a href='{item_url}'>{item_title}</a> - <b>Price:</b> ${item_price}\n"
         )
+        digest_line = f"<a href='{item_url}'>{item_title}</a> - ${item_price}"
 
-        self._send_message(message=message, emoji=emoji)
+        self._send_item_message(message, emoji, digest_line)
 
     def send_new_items_added(self, items_count: int) -> None:
         """
@@ -147,8 +492,9 @@ class TelegramBot:
             f"<a href='{item_url}'>{item_title}</a> \n"
             f"<b>Old Price:</b> ${item_old_price} - <b>New Price:</b> ${item_new_price}"
         )
+        digest_line = f"<a href='{item_url}'>{item_title}</a> - ${item_old_price} → ${item_new_price}"
 
-        self._send_message(message=message, emoji=emoji)
+        self._send_item_message(message, emoji, digest_line)
 
     def send_alert(self, message: str) -> None:
         """